@@ -0,0 +1,207 @@
+
+# Append-only ATC archives (ATC-APPEND-v1).
+#
+#   "ATCA" | version u8 | range-coded data | tail | trailer | u32 trailer length | "ATCA"
+#
+# Each carrier is coded with its space, punct and caps symbols right after it (as in
+# atc.seek), so the stream can grow. Carriers outside the alphabet so far are sent as an
+# escape plus three 7-bit codepoint symbols and then join the carrier model. The tail is
+# what `finish()` would emit for the current state, making the file decodable as it
+# stands; the trailer holds the coder registers, every model's frequency table and the
+# unsettled end of the text, so `ATCAppender(path)` resumes without touching earlier data.
+import os, struct
+from .encoder import encode_raw as atc_encode_raw, PUNCT_SET
+from .decoder import decode_raw
+from .utils import write_varint, read_varint
+from .arith import Model, ByteRangeEncoder, ByteRangeDecoder
+from .codec_ac import BASE_ALPHABET, ENDER_CODES, _BASE_CHARS, _carrier_model, _models
+
+FORMAT = "ATC-APPEND-v1"
+MAGIC = b"ATCA"
+VERSION = 1
+ESCAPE = len(BASE_ALPHABET)   # carrier symbol announcing a new char
+_FOOT = struct.Struct("<I4s")
+
+def _is_carrier(ch: str) -> bool:
+    return ch != " " and ch not in PUNCT_SET
+
+def settled(text: str) -> int:
+    """Length of the longest prefix that encodes exactly as it does inside any longer text:
+    it must end on a carrier that is followed by spaces and then another carrier."""
+    j = len(text) - 1
+    while j > 0:
+        if _is_carrier(text[j]):
+            k = j - 1
+            while k >= 0 and text[k] == " ":
+                k -= 1
+            if k >= 0 and _is_carrier(text[k]):
+                return k + 1
+            j = k
+        else:
+            j -= 1
+    return 0
+
+class _State:
+    """Models and alphabet shared by the appender and the reader."""
+    def __init__(self):
+        self.chars = _BASE_CHARS + [None]                 # index ESCAPE is the escape
+        self.index = {ch: i for i, ch in enumerate(_BASE_CHARS)}
+        self.ms = _models(len(self.chars))
+        self.cp = [Model(128) for _ in range(3)]
+        self.prev_p = 0
+        self.n = 0
+
+    def add_char(self, ch: str):
+        self.index[ch] = len(self.chars); self.chars.append(ch)
+        grown = _carrier_model(len(self.chars))
+        grown.seed(self.ms[0].freq + [1])
+        self.ms[0] = grown
+
+    def caps_model(self):
+        return self.ms[4] if self.prev_p in ENDER_CODES else self.ms[3]
+
+    def dump(self, out: bytearray):
+        write_varint(out, self.n); write_varint(out, self.prev_p)
+        ext = "".join(self.chars[ESCAPE+1:]).encode("utf-8", "surrogatepass")
+        write_varint(out, len(ext)); out += ext
+        for m in self.ms + self.cp:
+            for f in m.freq:
+                write_varint(out, f)
+
+    @classmethod
+    def load(cls, buf, off: int):
+        st = cls()
+        st.n, off = read_varint(buf, off); st.prev_p, off = read_varint(buf, off)
+        ln, off = read_varint(buf, off)
+        for ch in bytes(buf[off:off+ln]).decode("utf-8", "surrogatepass"):
+            st.add_char(ch)
+        off += ln
+        for m in st.ms + st.cp:
+            freq = []
+            for _ in range(m.n):
+                f, off = read_varint(buf, off); freq.append(f)
+            m.seed(freq)
+        return st, off
+
+def _code(enc, st: _State, carriers: str, style: bytes):
+    m_car, m_sp, m_pu = st.ms[0], st.ms[1], st.ms[2]
+    for ch, b in zip(carriers, style):
+        s = st.index.get(ch)
+        if s is None:
+            enc.encode(m_car, ESCAPE)
+            c = ord(ch)
+            for k, m in enumerate(st.cp):
+                enc.encode(m, (c >> (14 - 7*k)) & 0x7F)
+            st.add_char(ch); m_car = st.ms[0]
+        else:
+            enc.encode(m_car, s)
+        p = (b >> 2) & 0b111
+        enc.encode(m_sp, b & 0b11); enc.encode(m_pu, p)
+        enc.encode(st.caps_model(), (b >> 5) & 1)
+        st.prev_p = p
+    st.n += len(style)
+
+def _decode(dec, st: _State, n: int):
+    chars = []; style = bytearray()
+    for _ in range(n):
+        s = dec.decode(st.ms[0])
+        if s == ESCAPE:
+            c = 0
+            for m in st.cp:
+                c = (c << 7) | dec.decode(m)
+            st.add_char(chr(c))
+            s = len(st.chars) - 1
+        chars.append(st.chars[s])
+        sp = dec.decode(st.ms[1]); p = dec.decode(st.ms[2])
+        cap = dec.decode(st.caps_model())
+        style.append(sp | (p << 2) | (cap << 5))
+        st.prev_p = p
+    return "".join(chars), bytes(style)
+
+def _read_trailer(f):
+    """Parse the trailer of an open archive, reading only the header, footer and trailer."""
+    size = f.seek(0, os.SEEK_END)
+    f.seek(0); head = f.read(5)
+    if size < 5 + _FOOT.size or head[:4] != MAGIC:
+        raise ValueError("Not an ATC append archive")
+    if head[4] != VERSION:
+        raise ValueError(f"Unsupported ATC append archive version: {head[4]}")
+    f.seek(-_FOOT.size, os.SEEK_END)
+    tlen, magic = _FOOT.unpack(f.read(_FOOT.size))
+    if magic != MAGIC or tlen > size - 5 - _FOOT.size:
+        raise ValueError("Truncated ATC append archive (no trailer)")
+    f.seek(size - _FOOT.size - tlen)
+    buf = f.read(tlen)
+    data_len, o = read_varint(buf, 0)
+    tail_len, o = read_varint(buf, o)
+    regs = []
+    for _ in range(4):
+        v, o = read_varint(buf, o); regs.append(v)
+    ln, o = read_varint(buf, o)
+    held = bytes(buf[o:o+ln]).decode("utf-8", "surrogatepass"); o += ln
+    st, _ = _State.load(buf, o)
+    return data_len, tail_len, regs, held, st
+
+class ATCAppender:
+    """Append text to an archive at `path`, creating it or resuming from its trailer.
+    Every `append` leaves a complete, readable file behind."""
+    def __init__(self, path: str):
+        self.path = path
+        self.enc = ByteRangeEncoder()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                data_len, _, regs, self.held, self.st = _read_trailer(f)
+            self.enc.low, self.enc.range, self.enc.cache, self.enc.cache_size = regs
+            self.f = open(path, "r+b")
+            self.end = 5 + data_len
+        else:
+            self.held = ""; self.st = _State()
+            self.f = open(path, "w+b")
+            self.f.write(MAGIC + bytes([VERSION]))
+            self.end = 5
+        self._write()
+
+    def append(self, text: str):
+        self.held += text
+        cut = settled(self.held)
+        if cut:
+            carriers, style = atc_encode_raw(self.held[:cut])
+            _code(self.enc, self.st, carriers, style)
+            self.held = self.held[cut:]
+        self._write()
+
+    def _write(self):
+        enc = self.enc
+        self.f.seek(self.end)
+        self.f.write(enc.out); self.end += len(enc.out); enc.out.clear()
+        fin = ByteRangeEncoder()
+        fin.low, fin.range, fin.cache, fin.cache_size = enc.low, enc.range, enc.cache, enc.cache_size
+        tail = fin.finish()
+        trailer = bytearray()
+        write_varint(trailer, self.end - 5); write_varint(trailer, len(tail))
+        for v in (enc.low, enc.range, enc.cache, enc.cache_size):
+            write_varint(trailer, v)
+        held = self.held.encode("utf-8", "surrogatepass")
+        write_varint(trailer, len(held)); trailer += held
+        self.st.dump(trailer)
+        self.f.write(tail + trailer + _FOOT.pack(len(trailer), MAGIC))
+        self.f.truncate()
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_archive(path: str) -> str:
+    """Decode a whole archive in one pass (same text as decoding a single codec package)."""
+    with open(path, "rb") as f:
+        data_len, tail_len, _, held, st = _read_trailer(f)
+        f.seek(5)
+        data = f.read(data_len + tail_len)
+    carriers, style = _decode(ByteRangeDecoder(data), _State(), st.n)
+    return decode_raw(carriers, style) + decode_raw(*atc_encode_raw(held))
@@ -1,3 +1,4 @@
+from bisect import bisect_right
 
 PREC = 32
 FULL = (1<<PREC) - 1
@@ -7,7 +8,9 @@ Q3   = 3<<(PREC-2)
 
 class BitWriter:
     def __init__(self):
-        self.buf = 0; self.nbits = 0; self.bytes = bytearray()
+        self.bytes = bytearray(); self.reset()
+    def reset(self):
+        self.buf = 0; self.nbits = 0; del self.bytes[:]
     def write_bit(self, bit: int):
         self.buf = (self.buf<<1) | (bit & 1); self.nbits += 1
         if self.nbits == 8:
@@ -15,6 +18,12 @@ class BitWriter:
     def write_pending(self, bit: int, count: int):
         for _ in range(count):
             self.write_bit(bit ^ 1)
+    def write_bits(self, value: int, count: int):
+        """Append the low `count` bits of `value`, MSB first."""
+        buf = (self.buf << count) | value; nbits = self.nbits + count; out = self.bytes
+        while nbits >= 8:
+            nbits -= 8; out.append((buf >> nbits) & 0xFF)
+        self.buf = buf & ((1 << nbits) - 1); self.nbits = nbits
     def flush(self):
         if self.nbits:
             self.buf <<= (8 - self.nbits); self.bytes.append(self.buf & 0xFF)
@@ -28,8 +37,17 @@ class BitReader:
         if self.nbits == 0:
             self.buf = self.data[self.pos] if self.pos < len(self.data) else 0
             self.pos += 1; self.nbits = 8
-        bit = (self.buf >> 7) & 1; self.buf = (self.buf << 1) & 0xFF; self.nbits -= 1
-        return bit
+        self.nbits -= 1
+        return (self.buf >> self.nbits) & 1
+    def read_bits(self, count: int) -> int:
+        """The next `count` bits as one int, MSB first (zeros past the end)."""
+        nbits = self.nbits; buf = self.buf & ((1 << nbits) - 1)
+        data = self.data; pos = self.pos
+        while nbits < count:
+            buf = (buf << 8) | (data[pos] if pos < len(data) else 0); pos += 1; nbits += 8
+        nbits -= count
+        self.buf = buf; self.nbits = nbits; self.pos = pos
+        return buf >> nbits
 
 class Model:
     def __init__(self, n: int, max_total: int = 1<<15):
@@ -40,65 +58,261 @@ class Model:
         for i in range(self.n):
             self.cum[i] = s; s += self.freq[i]
         self.cum[self.n] = s; self.total = s
+    def _halve(self):
+        for i in range(self.n):
+            self.freq[i] = max(1, self.freq[i]>>1)
+        self._rebuild()
     def update(self, sym: int):
+        self.take(sym)
+    def take(self, sym: int):
+        """range(sym) and the total it is scaled by, then update(sym): one call per coded symbol."""
+        cum = self.cum; total = self.total; lowc = cum[sym]; highc = cum[sym+1]
+        self.freq[sym] += 1
+        if total >= self.max_total:
+            self._halve()
+        else:
+            for i in range(sym+1, self.n+1):  # only the bounds above sym move
+                cum[i] += 1
+            self.total = total + 1
+        return lowc, highc, total
+    def pick(self, value: int):
+        """find(value), then update(sym)."""
+        cum = self.cum; total = self.total
+        sym = bisect_right(cum, value, 0, self.n) - 1; lowc = cum[sym]; highc = cum[sym+1]
+        self.freq[sym] += 1
+        if total >= self.max_total:
+            self._halve()
+        else:
+            for i in range(sym+1, self.n+1):
+                cum[i] += 1
+            self.total = total + 1
+        return sym, lowc, highc
+    def seed(self, freq):
+        self.freq = [max(1, int(f)) for f in freq]; self._rebuild()
+    def copy(self):
+        # fields set in __init__ order (copy.copy's __dict__ update slows every later lookup)
+        m = Model.__new__(Model)
+        m.n = self.n; m.freq = self.freq[:]; m.cum = self.cum[:]; m.total = self.total
+        m.max_total = self.max_total
+        return m
+    def range(self, sym: int):
+        return self.cum[sym], self.cum[sym+1]
+    def find(self, value: int):
+        sym = bisect_right(self.cum, value, 0, self.n) - 1
+        return sym, self.cum[sym], self.cum[sym+1]
+
+class FenwickModel:
+    """Same statistics as Model (incl. halving at max_total), kept in a binary indexed tree:
+    O(log n) update, cumulative lookup and symbol search."""
+    def __init__(self, n: int, max_total: int = 1<<15):
+        self.n = n; self.freq = [1]*n; self.max_total = max_total
+        self.tree = [0]*(n+1); self.total = 0
+        self.top = 1
+        while self.top*2 <= n:
+            self.top *= 2
+        self._rebuild()
+    def _rebuild(self):
+        n = self.n; tree = self.tree; freq = self.freq
+        for i in range(1, n+1):
+            tree[i] = freq[i-1]
+        for i in range(1, n+1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self.total = sum(freq)
+    def seed(self, freq):
+        self.freq = [max(1, int(f)) for f in freq]; self._rebuild()
+    def copy(self):
+        m = FenwickModel.__new__(FenwickModel)
+        m.n = self.n; m.freq = self.freq[:]; m.max_total = self.max_total
+        m.tree = self.tree[:]; m.total = self.total; m.top = self.top
+        return m
+    def _prefix(self, i: int) -> int:
+        tree = self.tree; s = 0
+        while i > 0:
+            s += tree[i]; i &= i - 1
+        return s
+    def range(self, sym: int):
+        lowc = self._prefix(sym)
+        return lowc, lowc + self.freq[sym]
+    def find(self, value: int):
+        tree = self.tree; n = self.n
+        pos = 0; rem = value; step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= rem:
+                pos = nxt; rem -= tree[nxt]
+            step >>= 1
+        lowc = value - rem
+        return pos, lowc, lowc + self.freq[pos]
+    def _count(self, sym: int):
         self.freq[sym] += 1
         if self.total >= self.max_total:
+            freq = self.freq
             for i in range(self.n):
-                self.freq[i] = max(1, self.freq[i]>>1)
-        self._rebuild()
+                freq[i] = max(1, freq[i]>>1)
+            self._rebuild()
+            return
+        tree = self.tree; n = self.n; i = sym + 1
+        while i <= n:
+            tree[i] += 1; i += i & -i
+        self.total += 1
+    def update(self, sym: int):
+        self._count(sym)
+    def take(self, sym: int):
+        """range(sym) and the total it is scaled by, then update(sym)."""
+        tree = self.tree; total = self.total; lowc = 0; i = sym
+        while i > 0:
+            lowc += tree[i]; i &= i - 1
+        highc = lowc + self.freq[sym]
+        self._count(sym)
+        return lowc, highc, total
+    def pick(self, value: int):
+        """find(value), then update(sym)."""
+        sym, lowc, highc = self.find(value)
+        self._count(sym)
+        return sym, lowc, highc
+
+STATIC_LUT_MAX = 1<<16  # larger StaticModel totals are searched in `cum` instead
+
+class StaticModel:
+    """Fixed frequencies (e.g. exact counts from a first pass, normalized): no adaptation,
+    and `find` is a direct lookup in a table indexed by the scaled value (a binary search
+    once the total exceeds STATIC_LUT_MAX)."""
+    def __init__(self, freq):
+        self.freq = [int(f) for f in freq]; self.n = len(self.freq)
+        self.cum = [0]*(self.n+1)
+        for i, f in enumerate(self.freq):
+            self.cum[i+1] = self.cum[i] + f
+        self.total = self.cum[self.n]
+        self.lut = [s for s, f in enumerate(self.freq) for _ in range(f)] \
+            if self.total <= STATIC_LUT_MAX else None
+    def range(self, sym: int):
+        return self.cum[sym], self.cum[sym+1]
+    def find(self, value: int):
+        lut = self.lut
+        sym = lut[value] if lut is not None else bisect_right(self.cum, value, 0, self.n) - 1
+        return sym, self.cum[sym], self.cum[sym+1]
+    def update(self, sym: int):
+        pass
+    def take(self, sym: int):
+        return self.cum[sym], self.cum[sym+1], self.total
+    def pick(self, value: int):
+        return self.find(value)
+    def copy(self):
+        return self
 
 class Encoder:
     def __init__(self):
-        self.low = 0; self.high = FULL; self.pending = 0; self.bw = BitWriter()
+        self.bw = BitWriter(); self.reset()
+    def reset(self):
+        """Start a new stream on the same encoder object (batch packing)."""
+        self.low = 0; self.high = FULL; self.pending = 0; self.bw.reset()
     def encode(self, model: Model, sym: int):
-        total = model.total; lowc = model.cum[sym]; highc = model.cum[sym+1]
-        rng = self.high - self.low + 1
-        self.high = self.low + (rng * highc // total) - 1
-        self.low  = self.low + (rng * lowc  // total)
-        while True:
-            if self.high < HALF:
-                self.bw.write_bit(0); self.bw.write_pending(0, self.pending); self.pending = 0
-            elif self.low >= HALF:
-                self.bw.write_bit(1); self.bw.write_pending(1, self.pending); self.pending = 0
-                self.low -= HALF; self.high -= HALF
-            elif self.low >= Q1 and self.high < Q3:
-                self.pending += 1; self.low -= Q1; self.high -= Q1
-            else:
-                break
-            self.low = (self.low<<1) & FULL; self.high = ((self.high<<1) | 1) & FULL
-        model.update(sym)
+        lowc, highc, total = model.take(sym)
+        low = self.low; rng = self.high - low + 1
+        high = low + (rng * highc // total) - 1
+        low += rng * lowc // total
+        # All renormalization steps at once: the k leading bits low and high share are
+        # settled (the first one followed by the pending opposite bits), then every
+        # underflow step drops the bit below the top while low = 01.. and high = 10..
+        if high < HALF or low >= HALF:
+            k = PREC - (low ^ high).bit_length()
+            p = self.pending; top = low >> (PREC - k); b = top >> (k - 1)
+            first = b << p if b else (1 << p) - 1
+            self.bw.write_bits((first << (k - 1)) | (top & ((1 << (k - 1)) - 1)), k + p)
+            self.pending = 0
+            low = (low << k) & FULL; high = ((high << k) | ((1 << k) - 1)) & FULL
+        if low >= Q1 and high < Q3:
+            m = min(PREC - 1 - (~low & (HALF - 1)).bit_length(), PREC - 1 - (high & (HALF - 1)).bit_length())
+            self.pending += m
+            low = (low << m) & (HALF - 1); high = HALF | ((high << m) & (HALF - 1)) | ((1 << m) - 1)
+        self.low = low; self.high = high
     def finish(self):
-        self.pending += 1
+        p = self.pending + 1
         if self.low < Q1:
-            self.bw.write_bit(0); self.bw.write_pending(0, self.pending)
+            self.bw.write_bits((1 << p) - 1, p + 1)
         else:
-            self.bw.write_bit(1); self.bw.write_pending(1, self.pending)
+            self.bw.write_bits(1 << p, p + 1)
         return self.bw.flush()
 
 class Decoder:
     def __init__(self, data: bytes):
-        self.low = 0; self.high = FULL; self.br = BitReader(data); self.code = 0
-        for _ in range(PREC):
-            self.code = ((self.code<<1) | self.br.read_bit()) & FULL
+        self.low = 0; self.high = FULL; self.br = BitReader(data)
+        self.code = self.br.read_bits(PREC)
     def decode(self, model: Model) -> int:
-        total = model.total; rng = self.high - self.low + 1
-        value = ((self.code - self.low + 1)*total - 1) // rng
-        sym = 0
-        while model.cum[sym+1] <= value:
-            sym += 1
-        lowc = model.cum[sym]; highc = model.cum[sym+1]
-        self.high = self.low + (rng * highc // total) - 1
-        self.low  = self.low + (rng * lowc  // total)
-        while True:
-            if self.high < HALF:
-                pass
-            elif self.low >= HALF:
-                self.low -= HALF; self.high -= HALF; self.code -= HALF
-            elif self.low >= Q1 and self.high < Q3:
-                self.low -= Q1; self.high -= Q1; self.code -= Q1
-            else:
-                break
-            self.low = (self.low<<1) & FULL; self.high = ((self.high<<1)|1) & FULL
-            self.code = ((self.code<<1) | self.br.read_bit()) & FULL
-        model.update(sym)
+        low = self.low; code = self.code
+        total = model.total; rng = self.high - low + 1
+        value = ((code - low + 1)*total - 1) // rng
+        sym, lowc, highc = model.pick(value)
+        high = low + (rng * highc // total) - 1
+        low += rng * lowc // total
+        # same steps as Encoder.encode; code lies between low and high, so it loses the same
+        # bits, and the k + m bits shifted in are read in one go
+        k = 0
+        if high < HALF or low >= HALF:
+            k = PREC - (low ^ high).bit_length()
+            low = (low << k) & FULL; high = ((high << k) | ((1 << k) - 1)) & FULL
+            code = (code << k) & FULL
+        if low >= Q1 and high < Q3:
+            m = min(PREC - 1 - (~low & (HALF - 1)).bit_length(), PREC - 1 - (high & (HALF - 1)).bit_length())
+            low = (low << m) & (HALF - 1); high = HALF | ((high << m) & (HALF - 1)) | ((1 << m) - 1)
+            code = (code & HALF) | ((code << m) & (HALF - 1)); k += m
+        if k:
+            code |= self.br.read_bits(k)
+        self.low = low; self.high = high; self.code = code
+        return sym
+
+# Byte-wise range coder with carry propagation (Subbotin/Schindler style, as in LZMA's rc).
+# Renormalizes 8 bits at a time instead of one bit per call.
+RC_TOP = 1<<24
+RC_MASK = (1<<32) - 1
+
+class ByteRangeEncoder:
+    def __init__(self):
+        self.out = bytearray(); self.reset()
+    def reset(self):
+        self.low = 0; self.range = RC_MASK; self.cache = 0; self.cache_size = 1; del self.out[:]
+    def _shift_low(self):
+        low = self.low
+        if low < 0xFF000000 or low > RC_MASK:
+            carry = low >> 32; temp = self.cache; out = self.out
+            while True:
+                out.append((temp + carry) & 0xFF); temp = 0xFF
+                self.cache_size -= 1
+                if self.cache_size == 0:
+                    break
+            self.cache = (low >> 24) & 0xFF
+        self.cache_size += 1
+        self.low = (low << 8) & RC_MASK
+    def encode(self, model, sym: int):
+        lowc, highc, total = model.take(sym)
+        r = self.range // total
+        self.low += r * lowc
+        self.range = r * (highc - lowc)
+        while self.range < RC_TOP:
+            self.range <<= 8; self._shift_low()
+    def finish(self):
+        for _ in range(5):
+            self._shift_low()
+        return bytes(self.out)
+
+class ByteRangeDecoder:
+    def __init__(self, data: bytes):
+        self.data = data; self.pos = 0; self.range = RC_MASK; self.code = 0
+        for _ in range(5):
+            self.code = ((self.code << 8) | self._next()) & RC_MASK
+    def _next(self) -> int:
+        pos = self.pos; self.pos = pos + 1
+        return self.data[pos] if pos < len(self.data) else 0
+    def decode(self, model) -> int:
+        total = model.total
+        r = self.range // total
+        value = min(self.code // r, total - 1)
+        sym, lowc, highc = model.pick(value)
+        self.code -= r * lowc
+        self.range = r * (highc - lowc)
+        while self.range < RC_TOP:
+            self.range <<= 8
+            self.code = ((self.code << 8) | self._next()) & RC_MASK
         return sym
@@ -0,0 +1,80 @@
+
+# Byte-stream compressors behind codec_simple. Each back-end is name -> (compress, decompress);
+# zstd and brotli register only when their modules import. NAMES fixes the binary ids used by
+# atc.binfmt, so new back-ends are appended and existing ones never reordered.
+import bz2, lzma, zlib
+from typing import Callable, Dict, Sequence, Tuple
+
+try:
+    import zstandard as zstd
+except Exception:
+    zstd = None
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+NAMES = ("zlib-9", "zlib-6", "zlib-1", "lzma", "bz2",
+         "zstd-3", "zstd-9", "zstd-19", "brotli-5", "brotli-11")
+DEFAULT = "zlib-9"  # packages without a `backend` field were written with this
+AUTO = "auto"
+AUTO_SAMPLE = 64 * 1024  # bytes compressed per candidate when picking automatically
+
+def _zlib(level: int):
+    return lambda b: zlib.compress(b, level), zlib.decompress
+
+def _zstd(level: int):
+    return lambda b: zstd.ZstdCompressor(level=level).compress(b), \
+           lambda b: zstd.ZstdDecompressor().decompress(bytes(b))
+
+def _brotli(quality: int):
+    return lambda b: brotli.compress(bytes(b), quality=quality), lambda b: brotli.decompress(bytes(b))
+
+BACKENDS: Dict[str, Tuple[Callable, Callable]] = {
+    "zlib-9": _zlib(9), "zlib-6": _zlib(6), "zlib-1": _zlib(1),
+    "lzma": (lambda b: lzma.compress(b, format=lzma.FORMAT_ALONE, preset=9), lzma.decompress),
+    "bz2": (lambda b: bz2.compress(b, 9), bz2.decompress),
+}
+if zstd is not None:
+    BACKENDS.update({f"zstd-{lv}": _zstd(lv) for lv in (3, 9, 19)})
+if brotli is not None:
+    BACKENDS.update({f"brotli-{q}": _brotli(q) for q in (5, 11)})
+
+PRESETS = {
+    "fast": "zstd-3" if zstd is not None else "zlib-1",
+    "balanced": "zstd-9" if zstd is not None else "zlib-6",
+    "max": "lzma",
+}
+AUTO_CANDIDATES = ("zlib-9", "lzma", "bz2", "zstd-19", "brotli-11")
+
+def resolve(name: str) -> str:
+    """Back-end name for a back-end or preset name (`auto` is resolved by `choose`)."""
+    name = PRESETS.get(name, name)
+    if name not in BACKENDS:
+        known = sorted(BACKENDS) + sorted(PRESETS) + [AUTO]
+        raise ValueError(f"Unknown or unavailable back-end: {name!r} (expected one of {known})")
+    return name
+
+def _sample(raw: bytes, size: int) -> bytes:
+    if len(raw) <= size:
+        return raw
+    # a few evenly spaced slices so every stream in the payload is represented
+    k = 4; step = size // k; stride = (len(raw) - step) // (k - 1)
+    return b"".join(raw[i*stride:i*stride + step] for i in range(k))
+
+def choose(raw: bytes, candidates: Sequence[str] = AUTO_CANDIDATES, sample: int = AUTO_SAMPLE) -> str:
+    """Available candidate that compresses a sample of `raw` smallest."""
+    names = [c for c in candidates if c in BACKENDS]
+    probe = _sample(raw, sample)
+    return min(names, key=lambda c: len(BACKENDS[c][0](probe)))
+
+def compress(raw: bytes, name: str = DEFAULT) -> Tuple[str, bytes]:
+    """(back-end name, compressed bytes); `name` may be a back-end, a preset or `auto`."""
+    name = choose(raw) if name == AUTO else resolve(name)
+    return name, BACKENDS[name][0](raw)
+
+def decompress(data, name: str = DEFAULT) -> bytes:
+    if name not in BACKENDS:
+        raise ValueError(f"Package needs back-end {name!r}, which is not available here")
+    return BACKENDS[name][1](data)
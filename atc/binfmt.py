@@ -0,0 +1,149 @@
+
+# Binary framing for ATC packages (replaces JSON + base64 on disk).
+#
+#   magic "ATCB" | version u8 | format id u8 | varint n | varint len + ext (utf-8)
+#   | varint int fields (per format) | per byte section: varint len + bytes
+#
+# ATC-BLK-v1 containers store their codec name, offsets and nested frames instead.
+# `loads` slices sections as memoryviews, so loading from bytes or an mmap does not copy
+# the payload; the codec `unpack` functions accept these raw sections directly.
+import mmap
+from typing import Dict
+from .utils import payload, write_varint, read_varint
+from . import backends
+
+MAGIC = b"ATCB"
+VERSION = 1
+
+# format -> (id, int fields, byte sections)
+SPECS = {
+    "ATC-PKG":     (0, (), ("style",)),   # plain encoder output: carriers in the ext slot
+    "ATC-AC2-v1":  (1, ("prior",), ("data",)),
+    "ATC-AC2-v2":  (2, ("prior",), ("data",)),
+    "ATC-AC3-v1":  (3, ("prior",), ("data",)),
+    "ATC-BITZ-v1": (4, ("car_len", "sty_len"), ("data",)),
+    "ATC-AC-v1":   (5, (), ("data",)),
+    "ATC-AC-v2":   (6, (), ("data",)),
+    "ATC-RANS-v1": (7, ("lanes",), ("data",)),
+    "ATC-SEEK-v1": (8, ("spacing", "n_chars"), ("checkpoints", "data")),
+    "ATC-BLK-v1":  (9, (), ()),
+    "ATC-BITZ-v2": (10, ("backend", "layout"), ("data",)),
+    "ATC-ACW-v1":  (11, ("prior",), ("data",)),
+    "ATC-ACS-v1":  (12, (), ("data",)),
+    "ATC-ACP-v1":  (13, ("prior",), ("data",)),
+}
+_BY_ID = {v[0]: k for k, v in SPECS.items()}
+OPTIONAL_INTS = ("prior",)  # written as 0 when absent, dropped again on load
+# name fields stored as their index; a field equal to its default is dropped on load
+ENUMS = {"backend": (backends.NAMES, backends.DEFAULT), "layout": (("atc", "ws"), "atc")}
+
+def is_binary(buf) -> bool:
+    return bytes(buf[:4]) == MAGIC
+
+def _put_str(out: bytearray, s: str):
+    b = s.encode("utf-8", "surrogatepass")
+    write_varint(out, len(b)); out += b
+
+def _get_str(buf, off: int):
+    ln, off = read_varint(buf, off)
+    return bytes(buf[off:off+ln]).decode("utf-8", "surrogatepass"), off + ln
+
+def _put_bytes(out: bytearray, b):
+    write_varint(out, len(b)); out += b
+
+def _get_bytes(buf, off: int):
+    ln, off = read_varint(buf, off)
+    return buf[off:off+ln], off + ln
+
+def dumps(obj: Dict) -> bytes:
+    """Serialize a package from any ATC codec (or the plain encoder) to the binary frame."""
+    if "header" in obj:                       # codec_simple nests its fields
+        flat = dict(obj["header"]); flat["data"] = payload(obj, "data")
+        obj = flat
+    fmt = obj.get("format", "ATC-PKG")
+    if fmt not in SPECS:
+        raise ValueError(f"Unsupported format: {fmt!r}")
+    fid, ints, secs = SPECS[fmt]
+    out = bytearray(MAGIC); out += bytes([VERSION, fid])
+    if fmt == "ATC-BLK-v1":
+        _put_str(out, obj["codec"])
+        write_varint(out, int(obj["n_chars"]))
+        write_varint(out, len(obj["blocks"]))
+        for off in obj["offsets"]:
+            write_varint(out, int(off))
+        for blk in obj["blocks"]:
+            _put_bytes(out, dumps(blk))
+        return bytes(out)
+    if fmt == "ATC-PKG":
+        style = payload(obj, "style")
+        write_varint(out, len(style)); _put_str(out, obj["carriers"])
+    else:
+        write_varint(out, int(obj["n"])); _put_str(out, obj.get("ext", ""))
+    for k in ints:
+        if k in ENUMS:
+            names, default = ENUMS[k]
+            write_varint(out, names.index(obj.get(k, default)))
+        else:
+            write_varint(out, int(obj[k] if k not in OPTIONAL_INTS else obj.get(k, 0)))
+    for k in secs:
+        _put_bytes(out, payload(obj, k))
+    return bytes(out)
+
+def loads(buf) -> Dict:
+    """Parse a binary frame from bytes/bytearray/memoryview/mmap without copying payloads."""
+    mv = memoryview(buf)
+    if bytes(mv[:4]) != MAGIC:
+        raise ValueError("Not an ATC binary package")
+    version, fid = mv[4], mv[5]
+    if version != VERSION:
+        raise ValueError(f"Unsupported ATC binary version: {version}")
+    if fid not in _BY_ID:
+        raise ValueError(f"Unknown ATC format id: {fid}")
+    fmt = _BY_ID[fid]
+    _, ints, secs = SPECS[fmt]
+    off = 6
+    if fmt == "ATC-BLK-v1":
+        codec, off = _get_str(mv, off)
+        n_chars, off = read_varint(mv, off)
+        nblk, off = read_varint(mv, off)
+        offsets = []
+        for _ in range(nblk):
+            v, off = read_varint(mv, off); offsets.append(v)
+        blocks = []
+        for _ in range(nblk):
+            b, off = _get_bytes(mv, off); blocks.append(loads(b))
+        return {"format": fmt, "codec": codec, "n_chars": n_chars, "offsets": offsets, "blocks": blocks}
+    n, off = read_varint(mv, off)
+    ext, off = _get_str(mv, off)
+    obj = {"format": fmt, "n": n, "ext": ext}
+    for k in ints:
+        obj[k], off = read_varint(mv, off)
+        if k in ENUMS:
+            names, default = ENUMS[k]
+            obj[k] = names[obj[k]]
+            if obj[k] == default:
+                del obj[k]
+        elif k in OPTIONAL_INTS and not obj[k]:
+            del obj[k]
+    for k in secs:
+        obj[k], off = _get_bytes(mv, off)
+    if fmt == "ATC-PKG":
+        return {"carriers": ext, "style": obj["style"]}
+    if fmt.startswith("ATC-BITZ"):
+        data = obj.pop("data")
+        return {"header": obj, "data": data}
+    return obj
+
+def load(path: str) -> Dict:
+    """Memory-map `path` and parse it; payload sections stay views into the mapping."""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return loads(b"")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return loads(mm)
+
+def dump(obj: Dict, path: str) -> int:
+    blob = dumps(obj)
+    with open(path, "wb") as f:
+        f.write(blob)
+    return len(blob)
@@ -1,7 +1,29 @@
 
+from math import gcd
 from typing import Iterable, List
+import numpy as np
 
-def pack_bits(values: Iterable[int], bits_per: int) -> bytes:
+def _container(bits_per: int):
+    # smallest big-endian unsigned dtype holding bits_per bits
+    if not (1 <= bits_per <= 32):
+        raise ValueError("bits_per must be 1..32")
+    return np.dtype(">u1") if bits_per <= 8 else np.dtype(">u2") if bits_per <= 16 else np.dtype(">u4")
+
+def _group_bits(bits_per: int) -> int:
+    # bits in the smallest whole-byte group of values (lcm(bits_per, 8)); 0 if it exceeds a word
+    L = bits_per * 8 // gcd(bits_per, 8)
+    return L if L <= 64 else 0
+
+def _as_array(values) -> np.ndarray:
+    if isinstance(values, np.ndarray):
+        return values
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        return np.frombuffer(values, dtype=np.uint8)
+    if isinstance(values, (list, tuple)):
+        return np.asarray(values, dtype=np.int64)
+    return np.fromiter(values, dtype=np.int64)
+
+def pack_bits_py(values: Iterable[int], bits_per: int) -> bytes:
     buf = 0
     nbits = 0
     out = bytearray()
@@ -16,7 +38,7 @@ def pack_bits(values: Iterable[int], bits_per: int) -> bytes:
         out.append((buf << (8-nbits)) & 0xFF)
     return bytes(out)
 
-def unpack_bits(data: bytes, count: int, bits_per: int) -> List[int]:
+def unpack_bits_py(data: bytes, count: int, bits_per: int) -> List[int]:
     vals = []
     buf = 0
     nbits = 0
@@ -31,3 +53,66 @@ def unpack_bits(data: bytes, count: int, bits_per: int) -> List[int]:
         if len(vals) == count:
             break
     return vals
+
+def pack_bits_np(values, bits_per: int) -> bytes:
+    """Vectorized pack_bits: MSB-first, values masked to bits_per, last byte zero-padded."""
+    dt = _container(bits_per)
+    v = _as_array(values)
+    L = _group_bits(bits_per)
+    wd = np.dtype(np.uint32) if 0 < L <= 32 else np.dtype(np.uint64)
+    v = v.astype(wd, copy=False) & wd.type((1 << bits_per) - 1)
+    width = dt.itemsize * 8
+    if bits_per == width:
+        return v.astype(dt).tobytes()
+    nbytes = (v.size * bits_per + 7) // 8
+    if L:
+        # per-word shifts: G values -> one L-bit word -> L/8 bytes
+        G = L // bits_per
+        if v.size % G:
+            v = np.concatenate((v, np.zeros(G - v.size % G, dtype=wd)))
+        V = v.reshape(-1, G)
+        acc = V[:, 0] << wd.type(L - bits_per)
+        for k in range(1, G):
+            acc |= V[:, k] << wd.type(L - bits_per * (k + 1))
+        ws = wd.itemsize
+        out = acc.astype(wd.newbyteorder(">")).view(np.uint8).reshape(-1, ws)[:, ws - L // 8:]
+        return out.tobytes()[:nbytes]
+    v = v.astype(dt)
+    # widths without a <= 64-bit byte group: go through an explicit bit array
+    bits = np.unpackbits(v.view(np.uint8).reshape(-1, dt.itemsize), axis=1)[:, width - bits_per:]
+    return np.packbits(bits.ravel()).tobytes()
+
+def unpack_bits_np(data, count: int, bits_per: int) -> np.ndarray:
+    """Vectorized unpack_bits returning an ndarray (uint8/uint16/uint32 by width).
+    Byte-aligned widths return a zero-copy view over `data`."""
+    dt = _container(bits_per)
+    width = dt.itemsize * 8
+    raw = np.frombuffer(data, dtype=np.uint8)
+    count = max(0, min(count, raw.size * 8 // bits_per))
+    if bits_per == width:
+        return np.frombuffer(data, dtype=dt, count=count)
+    L = _group_bits(bits_per)
+    if L:
+        G = L // bits_per; gb = L // 8
+        m = -(-count // G)
+        words = np.zeros((m, 8), dtype=np.uint8)
+        used = raw[:min(raw.size, m * gb)]
+        block = np.zeros(m * gb, dtype=np.uint8); block[:used.size] = used
+        words[:, 8 - gb:] = block.reshape(m, gb)
+        acc = words.view(">u8").ravel().astype(np.uint64)
+        mask = np.uint64((1 << bits_per) - 1)
+        out = np.empty((m, G), dtype=dt.newbyteorder("="))
+        for k in range(G):
+            out[:, k] = (acc >> np.uint64(L - bits_per * (k + 1))) & mask
+        return out.ravel()[:count]
+    # widths without a <= 64-bit byte group: go through an explicit bit array
+    bits = np.unpackbits(raw[:(count * bits_per + 7) // 8])[:count * bits_per].reshape(count, bits_per)
+    padded = np.zeros((count, width), dtype=np.uint8)
+    padded[:, width - bits_per:] = bits
+    return np.packbits(padded, axis=1).view(dt).ravel().astype(dt.newbyteorder("="))
+
+def pack_bits(values: Iterable[int], bits_per: int) -> bytes:
+    return pack_bits_np(values, bits_per)
+
+def unpack_bits(data: bytes, count: int, bits_per: int) -> List[int]:
+    return unpack_bits_np(data, count, bits_per).tolist()
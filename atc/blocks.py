@@ -0,0 +1,58 @@
+
+from typing import Dict, List, Optional
+from .encoder import PUNCT_SET
+from .utils import run_jobs
+from . import codec_ac, codec_simple, packer, codec_rans
+
+FORMAT = "ATC-BLK-v1"
+CODECS = {"ac": codec_ac, "simple": codec_simple, "packer": packer, "rans": codec_rans}
+DEFAULT_BLOCK_CHARS = 1 << 20
+
+def _is_carrier(ch: str) -> bool:
+    return ch != " " and ch not in PUNCT_SET
+
+def split_blocks(text: str, block_chars: int = DEFAULT_BLOCK_CHARS) -> List[int]:
+    """Start offsets of blocks. A cut is only made between two carrier characters, so no
+    queued spaces or punctuation attachment cross it and the blocks code independently."""
+    starts = [0]
+    n = len(text)
+    i = block_chars
+    while i < n:
+        while i < n and not (_is_carrier(text[i-1]) and _is_carrier(text[i])):
+            i += 1
+        if i >= n:
+            break
+        starts.append(i)
+        i += block_chars
+    return starts
+
+def _pack_block(args):
+    codec, chunk = args
+    return CODECS[codec].pack(chunk)
+
+def _unpack_block(args):
+    codec, obj = args
+    return CODECS[codec].unpack(obj)
+
+def _inline(jobs, workers: Optional[int]) -> bool:
+    return workers == 1 or len(jobs) <= 1
+
+def pack(text: str, codec: str = "ac", block_chars: int = DEFAULT_BLOCK_CHARS,
+         workers: Optional[int] = None) -> Dict:
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec: {codec!r} (expected one of {sorted(CODECS)})")
+    starts = split_blocks(text, block_chars)
+    bounds = starts[1:] + [len(text)]
+    blocks = run_jobs(_pack_block, [(codec, text[a:b]) for a, b in zip(starts, bounds)], workers)
+    return {"format": FORMAT, "codec": codec, "n_chars": len(text), "offsets": starts, "blocks": blocks}
+
+def unpack(obj: Dict, workers: Optional[int] = None) -> str:
+    assert obj["format"] == FORMAT
+    codec = obj["codec"]
+    jobs = [(codec, b) for b in obj["blocks"]]
+    if not _inline(jobs, workers):
+        # blocks loaded by atc.binfmt hold memoryviews, which cannot be sent to workers
+        jobs = [(codec, {k: bytes(v) if isinstance(v, memoryview) else v for k, v in b.items()})
+                for _, b in jobs]
+    parts = run_jobs(_unpack_block, jobs, workers)
+    return "".join(parts)
@@ -1,24 +1,94 @@
 import argparse, json, sys
 from .encoder import encode as _encode
 from .decoder import decode as _decode
+from . import binfmt, blocks, codec_ac, codec_simple, packer, codec_rans, seek
+from .prior import load_prior
+
+# --codec choice -> pack function (None = plain carriers + style package)
+PACKERS = {
+    "pkg": None,
+    "ac": codec_ac.pack,
+    "ac3": lambda t: codec_ac.pack(t, fmt="ATC-AC3-v1"),
+    "acw": lambda t: codec_ac.pack(t, fmt=codec_ac.WORD_FORMAT),
+    "acs": lambda t: codec_ac.pack(t, fmt=codec_ac.STATIC_FORMAT),
+    "acp": lambda t: codec_ac.pack(t, fmt=codec_ac.SPLIT_FORMAT, workers=None),
+    "simple": codec_simple.pack,
+    "packer": packer.pack,
+    "rans": codec_rans.pack,
+    "seek": seek.pack,
+}
+
+def unpack_any(obj, prior=None) -> str:
+    """Decode any ATC package (plain or codec output, JSON or binary-loaded form)."""
+    if "header" in obj:
+        return codec_simple.unpack(obj)
+    fmt = obj.get("format")
+    if fmt is None:
+        return _decode(obj)
+    if fmt == codec_ac.SPLIT_FORMAT:
+        return codec_ac.unpack(obj, prior=prior, workers=None)
+    if fmt in codec_ac.CODERS:
+        return codec_ac.unpack(obj, prior=prior)
+    if fmt in packer.CODERS:
+        return packer.unpack(obj)
+    if fmt == codec_rans.FORMAT:
+        return codec_rans.unpack(obj)
+    if fmt == seek.FORMAT:
+        return seek.unpack(obj)
+    if fmt == blocks.FORMAT:
+        return blocks.unpack(obj)
+    raise ValueError(f"Unsupported format: {fmt!r}")
 
 def encode_main(argv=None):
     ap = argparse.ArgumentParser(description="ATC encoder (carriers + style bytes)")
     ap.add_argument("--text", type=str, help="Input text to encode")
     ap.add_argument("--infile", type=str, help="Read text from file (mutually exclusive)")
-    ap.add_argument("--out", type=str, default="-", help="JSON output (or '-')")
+    ap.add_argument("--out", type=str, default="-", help="Output path (or '-')")
+    ap.add_argument("--codec", choices=sorted(PACKERS), default="pkg", help="Package codec")
+    ap.add_argument("--format", choices=("json", "bin"), default="json", help="Output framing")
+    ap.add_argument("--prior", type=str, help="Prior file from acs-atc-train-prior (ac/ac3/acw/acp codecs)")
+    ap.add_argument("--backend", type=str,
+                    help="simple codec back-end: fast, balanced, max, auto or a name from atc.backends")
+    ap.add_argument("--layout", choices=codec_simple.LAYOUTS,
+                    help="simple codec style layout (ws: exact whitespace runs in their own stream)")
     args = ap.parse_args(argv)
     if (args.text is None) == (args.infile is None):
         print("Provide exactly one of --text or --infile", file=sys.stderr); sys.exit(1)
     text = args.text if args.text is not None else open(args.infile, "r", encoding="utf-8").read()
-    pkg = _encode(text)
+    fn = PACKERS[args.codec]
+    if args.prior is not None:
+        fmts = {"ac": codec_ac.DEFAULT_FORMAT, "ac3": "ATC-AC3-v1", "acw": codec_ac.WORD_FORMAT,
+                "acp": codec_ac.SPLIT_FORMAT}
+        if args.codec not in fmts:
+            print("--prior needs --codec ac, ac3, acw or acp", file=sys.stderr); sys.exit(1)
+        fmt = fmts[args.codec]
+        pkg = codec_ac.pack(text, fmt=fmt, prior=load_prior(args.prior), workers=None)
+    elif args.backend is not None or args.layout is not None:
+        if args.codec != "simple":
+            print("--backend/--layout need --codec simple", file=sys.stderr); sys.exit(1)
+        pkg = codec_simple.pack(text, backend=args.backend or codec_simple.backends.DEFAULT,
+                                layout=args.layout or "atc")
+    else:
+        pkg = _encode(text) if fn is None else fn(text)
+    if args.format == "bin":
+        blob = binfmt.dumps(pkg)
+        if args.out in ("-", None): sys.stdout.buffer.write(blob)
+        else: open(args.out, "wb").write(blob)
+        return
     out_json = json.dumps(pkg, ensure_ascii=False, indent=2)
     if args.out in ("-", None): print(out_json)
     else: open(args.out, "w", encoding="utf-8").write(out_json)
 
 def decode_main(argv=None):
-    ap = argparse.ArgumentParser(description="ATC decoder (JSON package to text)")
-    ap.add_argument("--in", dest="infile", type=str, default="-", help="JSON input (or '-')")
+    ap = argparse.ArgumentParser(description="ATC decoder (JSON or binary package to text)")
+    ap.add_argument("--in", dest="infile", type=str, default="-", help="Package input (or '-')")
+    ap.add_argument("--prior", type=str, help="Prior file the package was packed with")
     args = ap.parse_args(argv)
-    pkg = json.load(sys.stdin if args.infile in ("-", None) else open(args.infile, "r", encoding="utf-8"))
-    print(_decode(pkg))
+    if args.infile in ("-", None):
+        raw = sys.stdin.buffer.read()
+        pkg = binfmt.loads(raw) if binfmt.is_binary(raw) else json.loads(raw.decode("utf-8"))
+    else:
+        with open(args.infile, "rb") as f:
+            is_bin = binfmt.is_binary(f.read(4))
+        pkg = binfmt.load(args.infile) if is_bin else json.load(open(args.infile, "r", encoding="utf-8"))
+    print(unpack_any(pkg, prior=load_prior(args.prior) if args.prior else None))
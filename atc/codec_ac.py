@@ -1,18 +1,66 @@
 
 import base64
-from typing import Dict
-from .encoder import encode as atc_encode
-from .decoder import decode as atc_decode
-from .arith import Model, Encoder, Decoder
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from .encoder import encode_raw as atc_encode_raw
+from .decoder import decode_raw
+from .utils import payload, write_varint, read_varint, run_jobs, join_style, split_style
+from .arith import Model, FenwickModel, StaticModel, Encoder, Decoder, ByteRangeEncoder, ByteRangeDecoder
+from .rans import normalize_freqs, _scale_bits
 
 ZERO_WIDTH = "\u200b"
 BASE_ALPHABET = {**{chr(ord('a')+i): i for i in range(26)},
                  **{str(i): 26+i for i in range(10)},
                  ZERO_WIDTH: 36}
 ENDER_CODES = {1,3,4}  # ., !, ?
+# format -> (encoder, decoder); AC2 emits bit-at-a-time, AC3 renormalizes a byte at a time
+CODERS = {"ATC-AC2-v1": (Encoder, Decoder),
+          "ATC-AC2-v2": (Encoder, Decoder),
+          "ATC-AC3-v1": (ByteRangeEncoder, ByteRangeDecoder),
+          "ATC-ACW-v1": (ByteRangeEncoder, ByteRangeDecoder),
+          "ATC-ACS-v1": (ByteRangeEncoder, ByteRangeDecoder),
+          "ATC-ACP-v1": (ByteRangeEncoder, ByteRangeDecoder)}
+WORD_FORMAT = "ATC-ACW-v1"    # word-dictionary tokens instead of one symbol per carrier
+STATIC_FORMAT = "ATC-ACS-v1"  # semi-static: exact normalized tables up front, no adaptation
+SPLIT_FORMAT = "ATC-ACP-v1"   # one independently terminated sub-stream per model
+PACK_FORMATS = ("ATC-AC2-v2", "ATC-AC3-v1", WORD_FORMAT, STATIC_FORMAT, SPLIT_FORMAT)
+DEFAULT_FORMAT = "ATC-AC2-v2"
+BATCH_FORMAT = "ATC-AC-BATCH-v1"  # pack_many(shared_ext=True): ext alphabet stored once per batch
+FENWICK_MIN_ALPHABET = 16  # carrier alphabets at least this large use the O(log n) model
 
-def _rev_base():
-    return {v:k for k,v in BASE_ALPHABET.items()}
+def _carrier_model(n: int):
+    return FenwickModel(n) if n >= FENWICK_MIN_ALPHABET else Model(n)
+
+def _models(nsym: int, prior: Optional[Dict] = None):
+    """carriers, spaces, puncts, caps (normal), caps (after sentence ender); seeded from `prior`."""
+    ms = [_carrier_model(nsym), Model(4), Model(8), Model(2), Model(2)]
+    if prior is not None:
+        car = prior["carriers"]
+        ms[0].seed(list(car) + [1]*(nsym - len(car)))
+        for m, key in zip(ms[1:], ("spaces", "puncts", "caps", "caps_ender")):
+            m.seed(prior[key])
+    return ms
+
+def _fresh_models(protos: Optional[Dict], nsym: int, prior):
+    """_models(nsym, prior); batch callers pass a `protos` dict so each alphabet size is
+    built (and seeded) once and every item starts from a copy."""
+    if protos is None:
+        return _models(nsym, prior)
+    key = (nsym, None if prior is None else prior["id"])
+    if key not in protos:
+        protos[key] = _models(nsym, prior)
+    return [m.copy() for m in protos[key]]
+
+def _prior_for(obj, prior: Optional[Dict]):
+    pid = int(obj.get("prior", 0))
+    if not pid:
+        return None
+    if prior is None or int(prior["id"]) != pid:
+        raise ValueError(f"Package needs prior {pid:08x}")
+    return prior
+
+_BASE_CHARS = sorted(BASE_ALPHABET, key=BASE_ALPHABET.get)
 
 def _to_symbols(carriers: str, ext_map):
     for ch in carriers:
@@ -22,26 +70,34 @@ def _to_symbols(carriers: str, ext_map):
             yield ext_map[ch]
 
 def _to_carriers(symbols, ext_list):
-    rev = _rev_base(); base_size = len(BASE_ALPHABET)
-    out = []
-    for s in symbols:
-        if s in rev: out.append(rev[s])
-        else: out.append(ext_list[s - base_size])
-    return "".join(out)
-
-def pack(text: str) -> Dict[str, str]:
-    pkg = atc_encode(text)
-    carriers = pkg["carriers"]
-    style_bytes = base64.b64decode(pkg["style_b64"])
-
-    # dynamic ext
-    base_keys = set(BASE_ALPHABET.keys())
-    ext_chars = []
-    for ch in carriers:
-        if ch not in base_keys and ch not in ext_chars:
-            ext_chars.append(ch)
+    table = _BASE_CHARS + list(ext_list)
+    return "".join([table[s] for s in symbols])
+
+def _new_ext(carriers: str, known) -> List[str]:
+    return [ch for ch in dict.fromkeys(carriers) if ch not in known]
+
+def _ext_map(ext_list) -> Dict[str, int]:
     base_size = len(BASE_ALPHABET)
-    ext_map = {ch: base_size + i for i, ch in enumerate(ext_chars)}
+    return {ch: base_size + i for i, ch in enumerate(ext_list)}
+
+def _code(fmt: str, carriers: str, style_bytes: bytes, ext_map, prior, workers: Optional[int] = 1,
+          protos: Optional[Dict] = None, enc=None) -> bytes:
+    """`protos` and `enc` (reset here) let batch callers reuse models and the encoder."""
+    if fmt == SPLIT_FORMAT:
+        return _code_split(fmt, carriers, style_bytes, ext_map, prior, workers)
+    if fmt == WORD_FORMAT:
+        return _code_words(fmt, carriers, style_bytes, ext_map, prior)
+    if fmt == STATIC_FORMAT:
+        return _code_static(fmt, carriers, style_bytes, ext_map)
+    if enc is None:
+        enc = CODERS[fmt][0]()
+    else:
+        enc.reset()
+    m_car, m_sp, m_pu, m_cn, m_ce = _fresh_models(protos, len(BASE_ALPHABET) + len(ext_map), prior)
+
+    # carriers
+    for s in _to_symbols(carriers, ext_map):
+        enc.encode(m_car, s)
 
     # split style
     spaces = []; puncts = []; caps = []
@@ -49,59 +105,338 @@ def pack(text: str) -> Dict[str, str]:
         s = b & 0b11; p = (b>>2) & 0b111; c = (b>>5) & 0b1
         spaces.append(s); puncts.append(p); caps.append(c)
 
-    enc = Encoder()
-
-    # carriers
-    m_car = Model(base_size + len(ext_chars))
-    for s in _to_symbols(carriers, ext_map):
-        enc.encode(m_car, s)
-
     # spaces
-    m_sp = Model(4)
     for s in spaces:
         enc.encode(m_sp, s)
 
     # puncts
-    m_pu = Model(8)
     for p in puncts:
         enc.encode(m_pu, p)
 
     # caps with context
-    m_cn = Model(2); m_ce = Model(2); prev_p = 0
+    prev_p = 0
     for i, c in enumerate(caps):
         mdl = m_ce if (prev_p in ENDER_CODES) else m_cn
         enc.encode(mdl, c)
         prev_p = puncts[i]
 
-    blob = enc.finish()
-    return {"format":"ATC-AC2-v2","n":len(style_bytes),"ext":"".join(ext_chars),"data_b64": base64.b64encode(blob).decode("ascii")}
-
-def unpack(obj: Dict[str,str]) -> str:
-    assert obj["format"] in ("ATC-AC2-v1","ATC-AC2-v2")
-    n = int(obj["n"]); ext_chars = list(obj.get("ext",""))
-    data = base64.b64decode(obj["data_b64"])
+    return enc.finish()
 
-    dec = Decoder(data)
-    base_size = len(BASE_ALPHABET)
+def _decode(fmt: str, data, n: int, ext_chars, prior, workers: Optional[int] = 1,
+            protos: Optional[Dict] = None) -> str:
+    if fmt == SPLIT_FORMAT:
+        return _decode_split(fmt, data, n, ext_chars, prior, workers)
+    if fmt == WORD_FORMAT:
+        return _decode_words(fmt, data, n, ext_chars, prior)
+    if fmt == STATIC_FORMAT:
+        return _decode_static(fmt, data, n, ext_chars)
+    dec = CODERS[fmt][1](data)
+    m_car, m_sp, m_pu, m_cn, m_ce = _fresh_models(protos, len(BASE_ALPHABET) + len(ext_chars), prior)
 
     # carriers
-    m_car = Model(base_size + len(ext_chars))
     carriers_sym = [dec.decode(m_car) for _ in range(n)]
     carriers = _to_carriers(carriers_sym, ext_chars)
 
     # spaces
-    m_sp = Model(4); spaces = [dec.decode(m_sp) for _ in range(n)]
+    spaces = [dec.decode(m_sp) for _ in range(n)]
     # puncts
-    m_pu = Model(8); puncts = [dec.decode(m_pu) for _ in range(n)]
+    puncts = [dec.decode(m_pu) for _ in range(n)]
     # caps with context
-    m_cn = Model(2); m_ce = Model(2); caps = [0]*n; prev_p = 0
+    caps = [0]*n; prev_p = 0
     for i in range(n):
         mdl = m_ce if (prev_p in ENDER_CODES) else m_cn
         caps[i] = dec.decode(mdl); prev_p = puncts[i]
 
-    style_bytes = bytearray(n)
-    for i in range(n):
-        b = (spaces[i] & 0b11) | ((puncts[i] & 0b111)<<2) | ((caps[i] & 0b1)<<5)
-        style_bytes[i] = b
-    pkg = {"carriers": carriers, "style_b64": base64.b64encode(bytes(style_bytes)).decode("ascii")}
-    return atc_decode(pkg)
+    return decode_raw(carriers, join_style(spaces, puncts, caps))
+
+# Word mode. A word is a run of carriers with no spaces or punctuation inside it; the
+# boundaries come from the style bytes, so each word is coded as one dictionary symbol
+# (or an escape + length + chars) plus its spaces-before, punct-after and caps pattern.
+# The dictionary is the prior's "words" followed by repeated words of the document,
+# which are sent at the start of the stream; the word model is seeded by rank (Zipf).
+MAX_WORDS = 4096
+LEN_ESC = 15           # literal lengths >= LEN_ESC continue in the next length symbol
+WORD_SEED = 1024       # seeded frequency of dictionary rank 0; rank r gets WORD_SEED // (r+1)
+WORD_MAX_TOTAL = 1<<16
+CAPS_NONE, CAPS_FIRST, CAPS_ALL, CAPS_MIXED = range(4)
+
+def _words(carriers: str, style_bytes) -> List[tuple]:
+    """(word, spaces before, punct after, cap flags) per word of an encoded text."""
+    sty = np.frombuffer(style_bytes, dtype=np.uint8)
+    n = sty.size
+    if not n:
+        return []
+    brk = np.ones(n, dtype=bool)
+    brk[1:] = ((sty[1:] & 0b11) > 0) | ((sty[:-1] >> 2 & 0b111) > 0)
+    starts = np.flatnonzero(brk).tolist()
+    ends = starts[1:] + [n]
+    caps = (sty >> 5 & 1).tolist(); sty = sty.tolist()
+    return [(carriers[a:b], sty[a] & 0b11, sty[b-1] >> 2 & 0b111, caps[a:b]) for a, b in zip(starts, ends)]
+
+def frequent_words(words, limit: int = MAX_WORDS, exclude=()) -> List[str]:
+    counts = Counter(w for w, *_ in words if ZERO_WIDTH not in w)
+    ranked = sorted((w for w, c in counts.items() if c >= 2 and w not in exclude),
+                    key=lambda w: -counts[w])
+    return ranked[:limit]
+
+def _caps_pattern(flags) -> int:
+    if not any(flags):
+        return CAPS_NONE
+    if flags[0] and not any(flags[1:]):
+        return CAPS_FIRST
+    return CAPS_ALL if all(flags) else CAPS_MIXED
+
+def _word_models(nsym: int, ndict: int, prior):
+    m_car, m_sp, m_pu, _, _ = _models(nsym, prior)
+    m_word = FenwickModel(ndict + 1, max_total=WORD_MAX_TOTAL)  # last symbol = literal escape
+    m_word.seed([WORD_SEED // (r+1) for r in range(ndict)] + [WORD_SEED // 4])
+    # car, word, length, spaces, punct, caps pattern (normal / after ender), per-char caps
+    return m_car, m_word, Model(LEN_ESC + 1), m_sp, m_pu, Model(4), Model(4), Model(2)
+
+def _put_literal(enc, m_car, m_len, word: str, ext_map):
+    n = len(word)
+    while n >= LEN_ESC:
+        enc.encode(m_len, LEN_ESC); n -= LEN_ESC
+    enc.encode(m_len, n)
+    for s in _to_symbols(word, ext_map):
+        enc.encode(m_car, s)
+
+def _get_literal(dec, m_car, m_len, table) -> str:
+    n = 0
+    while True:
+        k = dec.decode(m_len); n += k
+        if k < LEN_ESC:
+            break
+    return "".join([table[dec.decode(m_car)] for _ in range(n)])
+
+def _code_words(fmt: str, carriers: str, style_bytes: bytes, ext_map, prior) -> bytes:
+    words = _words(carriers, style_bytes)
+    static = list(prior.get("words", ())) if prior is not None else []
+    doc = frequent_words(words, MAX_WORDS - len(static), exclude=set(static))
+    index = {w: i for i, w in enumerate(static + doc)}
+    esc = len(index)
+    m_car, m_word, m_len, m_sp, m_pu, m_cn, m_ce, m_cbit = \
+        _word_models(len(BASE_ALPHABET) + len(ext_map), esc, prior)
+    enc = CODERS[fmt][0]()
+    for w in doc:
+        _put_literal(enc, m_car, m_len, w, ext_map)
+    prev_p = 0
+    for w, sp, pu, caps in words:
+        i = index.get(w, esc)
+        enc.encode(m_word, i)
+        if i == esc:
+            _put_literal(enc, m_car, m_len, w, ext_map)
+        enc.encode(m_sp, sp); enc.encode(m_pu, pu)
+        pat = _caps_pattern(caps)
+        enc.encode(m_ce if prev_p in ENDER_CODES else m_cn, pat)
+        if pat == CAPS_MIXED:
+            for c in caps:
+                enc.encode(m_cbit, c)
+        prev_p = pu
+    head = bytearray(); write_varint(head, len(doc))
+    return bytes(head) + enc.finish()
+
+def _decode_words(fmt: str, data, n: int, ext_chars, prior) -> str:
+    ndoc, off = read_varint(data, 0)
+    static = list(prior.get("words", ())) if prior is not None else []
+    esc = len(static) + ndoc
+    table = _BASE_CHARS + list(ext_chars)
+    m_car, m_word, m_len, m_sp, m_pu, m_cn, m_ce, m_cbit = \
+        _word_models(len(table), esc, prior)
+    dec = CODERS[fmt][1](data[off:])
+    dictionary = static + [_get_literal(dec, m_car, m_len, table) for _ in range(ndoc)]
+    parts = []; style = bytearray(); prev_p = 0; got = 0
+    while got < n:
+        i = dec.decode(m_word)
+        w = dictionary[i] if i < esc else _get_literal(dec, m_car, m_len, table)
+        sp = dec.decode(m_sp); pu = dec.decode(m_pu)
+        pat = dec.decode(m_ce if prev_p in ENDER_CODES else m_cn)
+        k = len(w)
+        if pat == CAPS_MIXED:
+            caps = [dec.decode(m_cbit) for _ in range(k)]
+        else:
+            caps = [int(pat == CAPS_ALL or (pat == CAPS_FIRST and j == 0)) for j in range(k)]
+        row = [c << 5 for c in caps]
+        row[0] |= sp; row[-1] |= pu << 2
+        parts.append(w); style += bytes(row); got += k; prev_p = pu
+    return decode_raw("".join(parts), bytes(style))
+
+# Semi-static mode: a first pass counts every stream exactly; the tables, normalized to a
+# power-of-two total, go in front of the range-coded data as varints. Coding then uses
+# fixed cumulative arrays (StaticModel), so no symbol pays for a model update.
+STATIC_BITS = 12  # table precision of the style models
+
+def _split_style(style_bytes):
+    spaces, puncts, caps = split_style(style_bytes)
+    prev = np.zeros_like(puncts); prev[1:] = puncts[:-1]
+    ender = np.isin(prev, list(ENDER_CODES))
+    return spaces, puncts, caps, ender
+
+def _static_bits(car_present: int):
+    """Carrier table sized by the carriers actually present, so every one gets a slot."""
+    return (_scale_bits(car_present), STATIC_BITS, STATIC_BITS, STATIC_BITS, STATIC_BITS)
+
+def _code_static(fmt: str, carriers: str, style_bytes: bytes, ext_map) -> bytes:
+    nsym = len(BASE_ALPHABET) + len(ext_map)
+    syms = np.fromiter(_to_symbols(carriers, ext_map), dtype=np.int64, count=len(carriers))
+    spaces, puncts, caps, ender = _split_style(style_bytes)
+    counts = (np.bincount(syms, minlength=nsym), np.bincount(spaces, minlength=4),
+              np.bincount(puncts, minlength=8), np.bincount(caps[~ender], minlength=2),
+              np.bincount(caps[ender], minlength=2))
+    head = bytearray(); ms = []
+    for c, bits in zip(counts, _static_bits(np.count_nonzero(counts[0]))):
+        freq = normalize_freqs(c, bits).tolist()
+        for f in freq:
+            write_varint(head, f)
+        ms.append(StaticModel(freq))
+    m_car, m_sp, m_pu, m_cn, m_ce = ms
+    enc = CODERS[fmt][0](); code = enc.encode
+    for s in syms.tolist():
+        code(m_car, s)
+    for s in spaces.tolist():
+        code(m_sp, s)
+    for p in puncts.tolist():
+        code(m_pu, p)
+    for c, e in zip(caps.tolist(), ender.tolist()):
+        code(m_ce if e else m_cn, c)
+    return bytes(head) + enc.finish()
+
+def _decode_static(fmt: str, data, n: int, ext_chars) -> str:
+    nsym = len(BASE_ALPHABET) + len(ext_chars)
+    off = 0; ms = []
+    for size in (nsym, 4, 8, 2, 2):
+        freq = []
+        for _ in range(size):
+            f, off = read_varint(data, off); freq.append(f)
+        ms.append(StaticModel(freq))
+    m_car, m_sp, m_pu, m_cn, m_ce = ms
+    dec = CODERS[fmt][1](data[off:]); get = dec.decode
+    carriers = _to_carriers([get(m_car) for _ in range(n)], ext_chars)
+    spaces = [get(m_sp) for _ in range(n)]
+    puncts = [get(m_pu) for _ in range(n)]
+    caps = [0]*n; prev_p = 0
+    for i, p in enumerate(puncts):
+        caps[i] = get(m_ce if prev_p in ENDER_CODES else m_cn); prev_p = p
+    return decode_raw(carriers, join_style(spaces, puncts, caps))
+
+# Split mode: carriers, spaces, puncts, caps and caps-after-ender each get their own model
+# and range coder, terminated independently. The data starts with the number of
+# after-ender positions and the five sub-stream sizes, so every sub-stream can be coded
+# or decoded on its own (in a process pool) and the style bytes are merged with array ops.
+def _split_job(args):
+    k, fmt, payload_, nsym, prior, count = args
+    m = _models(nsym, prior)[k]
+    if count is None:                        # encode: payload_ is the symbol list
+        enc = CODERS[fmt][0](); code = enc.encode
+        for s in payload_:
+            code(m, s)
+        return enc.finish()
+    get = CODERS[fmt][1](payload_).decode
+    return [get(m) for _ in range(count)]
+
+def _code_split(fmt: str, carriers: str, style_bytes: bytes, ext_map, prior, workers) -> bytes:
+    nsym = len(BASE_ALPHABET) + len(ext_map)
+    spaces, puncts, caps, ender = _split_style(style_bytes)
+    streams = (list(_to_symbols(carriers, ext_map)), spaces.tolist(), puncts.tolist(),
+               caps[~ender].tolist(), caps[ender].tolist())
+    blobs = run_jobs(_split_job, [(k, fmt, s, nsym, prior, None) for k, s in enumerate(streams)], workers)
+    head = bytearray(); write_varint(head, int(ender.sum()))
+    for b in blobs:
+        write_varint(head, len(b))
+    return bytes(head) + b"".join(blobs)
+
+def _decode_split(fmt: str, data, n: int, ext_chars, prior, workers) -> str:
+    n_ender, off = read_varint(data, 0)
+    sizes = []
+    for _ in range(5):
+        size, off = read_varint(data, off); sizes.append(size)
+    counts = (n, n, n, n - n_ender, n_ender)
+    nsym = len(BASE_ALPHABET) + len(ext_chars)
+    jobs = []
+    for k, (size, count) in enumerate(zip(sizes, counts)):
+        jobs.append((k, fmt, bytes(data[off:off+size]), nsym, prior, count)); off += size
+    car, spaces, puncts, caps_n, caps_e = (np.asarray(r, dtype=np.uint8 if k else np.int64)
+                                           for k, r in enumerate(run_jobs(_split_job, jobs, workers)))
+    prev = np.zeros_like(puncts); prev[1:] = puncts[:-1]
+    ender = np.isin(prev, list(ENDER_CODES))
+    caps = np.zeros(n, dtype=np.uint8)
+    caps[~ender] = caps_n; caps[ender] = caps_e
+    table = np.array([ord(ch) for ch in _BASE_CHARS + list(ext_chars)], dtype="<u4")
+    carriers = table[car].tobytes().decode("utf-32-le", "surrogatepass")
+    return decode_raw(carriers, join_style(spaces, puncts, caps))
+
+def _wrap(fmt: str, n: int, ext: str, blob: bytes, prior, b64: bool = True) -> Dict:
+    out = {"format":fmt,"n":n,"ext":ext}
+    if b64:
+        out["data_b64"] = base64.b64encode(blob).decode("ascii")
+    else:
+        out["data"] = blob
+    if prior is not None:
+        out["prior"] = int(prior["id"])
+    return out
+
+def _check_fmt(fmt: str, prior=None):
+    if fmt not in PACK_FORMATS:
+        raise ValueError(f"Unsupported pack format: {fmt!r}")
+    if fmt == STATIC_FORMAT and prior is not None:
+        raise ValueError(f"{STATIC_FORMAT} stores exact tables and takes no prior")
+
+def pack(text: str, fmt: str = DEFAULT_FORMAT, prior: Optional[Dict] = None,
+         workers: Optional[int] = 1) -> Dict[str, str]:
+    """`workers` codes the ATC-ACP-v1 sub-streams in a process pool (None = one per CPU)."""
+    _check_fmt(fmt, prior)
+    carriers, style_bytes = atc_encode_raw(text)
+    # dynamic ext (after the prior's own ext chars, if any)
+    prior_ext = list(prior["ext"]) if prior is not None else []
+    ext_chars = _new_ext(carriers, BASE_ALPHABET.keys() | set(prior_ext))
+    blob = _code(fmt, carriers, style_bytes, _ext_map(prior_ext + ext_chars), prior, workers)
+    return _wrap(fmt, len(style_bytes), "".join(ext_chars), blob, prior)
+
+def unpack(obj: Dict[str,str], prior: Optional[Dict] = None, workers: Optional[int] = 1) -> str:
+    assert obj["format"] in CODERS
+    n = int(obj["n"]); ext_chars = list(obj.get("ext",""))
+    prior = _prior_for(obj, prior)
+    if prior is not None:
+        ext_chars = list(prior["ext"]) + ext_chars
+    return _decode(obj["format"], payload(obj), n, ext_chars, prior, workers)
+
+def pack_many(texts: Sequence[str], fmt: str = DEFAULT_FORMAT, prior: Optional[Dict] = None,
+              shared_ext: bool = False, b64: bool = True):
+    """Pack many (typically short) texts. Ext maps and the seeded AC2/AC3 models are built
+    once per batch (items start from copies) and one encoder is reused; with `shared_ext`
+    the ext alphabet is stored once in a batch object instead of per item. Output equals
+    per-item `pack`; throughput is about the same, since per-symbol coding dominates."""
+    _check_fmt(fmt, prior)
+    prior_ext = list(prior["ext"]) if prior is not None else []
+    known = BASE_ALPHABET.keys() | set(prior_ext)
+    encoded = [atc_encode_raw(t) for t in texts]
+    protos = {}; enc = CODERS[fmt][0]()
+    if shared_ext:
+        batch_ext = _new_ext("".join(c for c, _ in encoded), known)
+        ext_map = _ext_map(prior_ext + batch_ext)
+        items = [_wrap(fmt, len(sty), "", _code(fmt, car, sty, ext_map, prior, 1, protos, enc), prior, b64)
+                 for car, sty in encoded]
+        return {"format": BATCH_FORMAT, "ext": "".join(batch_ext), "items": items}
+    maps = {}
+    out = []
+    for car, sty in encoded:
+        ext = "".join(_new_ext(car, known))
+        if ext not in maps:
+            maps[ext] = _ext_map(prior_ext + list(ext))
+        blob = _code(fmt, car, sty, maps[ext], prior, 1, protos, enc)
+        out.append(_wrap(fmt, len(sty), ext, blob, prior, b64))
+    return out
+
+def unpack_many(objs, prior: Optional[Dict] = None) -> List[str]:
+    """Inverse of pack_many; accepts a list of packages or a shared-ext batch object."""
+    shared = []
+    if isinstance(objs, dict):
+        assert objs["format"] == BATCH_FORMAT
+        shared = list(objs["ext"]); objs = objs["items"]
+    protos = {}; out = []
+    for obj in objs:
+        assert obj["format"] in CODERS
+        p = _prior_for(obj, prior)
+        ext_chars = (list(p["ext"]) if p is not None else []) + shared + list(obj.get("ext", ""))
+        out.append(_decode(obj["format"], payload(obj), int(obj["n"]), ext_chars, p, 1, protos))
+    return out
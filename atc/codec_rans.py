@@ -0,0 +1,58 @@
+
+import base64
+from typing import Dict
+import numpy as np
+from .encoder import encode_raw as atc_encode_raw
+from .decoder import decode_raw
+from .codec_ac import BASE_ALPHABET
+from .utils import payload, write_varint, read_varint, join_style
+from .rans import encode_stream, decode_stream
+
+FORMAT = "ATC-RANS-v1"
+DEFAULT_LANES = 32
+
+def _carrier_symbols(carriers: str):
+    cps = np.frombuffer(carriers.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    uniq, inv = np.unique(cps, return_inverse=True)
+    chars = [chr(c) for c in uniq.tolist()]
+    ext_chars = [ch for ch in chars if ch not in BASE_ALPHABET]
+    base_size = len(BASE_ALPHABET)
+    ext_map = {ch: base_size + i for i, ch in enumerate(ext_chars)}
+    table = np.array([BASE_ALPHABET[ch] if ch in BASE_ALPHABET else ext_map[ch] for ch in chars], dtype=np.int64)
+    return table[inv.reshape(-1)], ext_chars
+
+def _symbol_chars(ext_chars):
+    base = sorted(BASE_ALPHABET, key=BASE_ALPHABET.get)
+    return np.array([ord(ch) for ch in base + list(ext_chars)], dtype="<u4")
+
+def pack(text: str, lanes: int = DEFAULT_LANES) -> Dict[str, str]:
+    carriers, style_bytes = atc_encode_raw(text)
+    style = np.frombuffer(style_bytes, dtype=np.uint8)
+    car_syms, ext_chars = _carrier_symbols(carriers)
+
+    # static tables per stream; caps stays order-0 here (no adaptive context)
+    streams = [(car_syms, len(BASE_ALPHABET) + len(ext_chars)),
+               (style & 0b11, 4),
+               ((style >> 2) & 0b111, 8),
+               ((style >> 5) & 0b1, 2)]
+    data = bytearray()
+    for syms, nsym in streams:
+        blob = encode_stream(syms, nsym, lanes=lanes)
+        write_varint(data, len(blob))
+        data += blob
+    return {"format": FORMAT, "n": int(style.size), "lanes": lanes, "ext": "".join(ext_chars),
+            "data_b64": base64.b64encode(bytes(data)).decode("ascii")}
+
+def unpack(obj: Dict[str, str]) -> str:
+    assert obj["format"] == FORMAT
+    n = int(obj["n"]); lanes = int(obj["lanes"]); ext_chars = list(obj.get("ext", ""))
+    data = payload(obj)
+    off = 0
+    parts = []
+    for _ in range(4):
+        size, off = read_varint(data, off)
+        syms, _ = decode_stream(data, off, n, lanes=lanes)
+        parts.append(syms); off += size
+    car_syms, spaces, puncts, caps = parts
+    carriers = _symbol_chars(ext_chars)[car_syms].tobytes().decode("utf-32-le", "surrogatepass")
+    return decode_raw(carriers, join_style(spaces, puncts, caps))
@@ -1,17 +1,28 @@
 
-import base64, zlib
-from typing import Dict, List
-from .encoder import encode as atc_encode
-from .decoder import decode as atc_decode
-from .utils import parse_style_byte
-from .bitpack import pack_bits, unpack_bits
+import base64
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from .encoder import encode_raw as atc_encode_raw
+from .decoder import decode_raw
+from .utils import payload, write_varint, read_varint
+from .bitpack import pack_bits_py, unpack_bits_py, pack_bits_np, unpack_bits_np
+from .whitespace import LAYOUT as WS_LAYOUT, encode_ws, decode_ws
+from . import backends
 
 ZERO_WIDTH = "\u200b"
 BASE_ALPHABET = {**{chr(ord('a')+i): i for i in range(26)},
                  **{str(i): 26+i for i in range(10)},
                  ZERO_WIDTH: 36}
-def _rev_base():
-    return {v:k for k,v in BASE_ALPHABET.items()}
+FORMAT = "ATC-BITZ-v2"
+FORMATS = ("ATC-BITZ-v1", FORMAT)
+LAYOUTS = ("atc", WS_LAYOUT)  # "ws": run-length whitespace stream, see atc.whitespace
+BATCH_FORMAT = "ATC-BITZ-BATCH-v1"  # pack_many(shared_ext=True): ext alphabet stored once per batch
+_BASE_CHARS = sorted(BASE_ALPHABET, key=BASE_ALPHABET.get)
+# below this many symbols the v2 rank tables cost more than they save (and numpy setup
+# dominates), so short default-backend "atc" messages keep the fixed 6-bit ATC-BITZ-v1
+# streams; v1 headers (and their binary frames) have no backend or layout field
+RANK_MIN = 192
 
 def _to_symbols(carriers: str, ext_map):
     for ch in carriers:
@@ -20,87 +31,162 @@ def _to_symbols(carriers: str, ext_map):
         else:
             yield ext_map[ch]
 
-def _to_carriers(symbols, ext_list):
-    rev = _rev_base()
-    base_size = len(BASE_ALPHABET)
-    out = []
-    for s in symbols:
-        if s in rev: out.append(rev[s])
-        else: out.append(ext_list[s - base_size])
-    return "".join(out)
-
-def pack(text: str) -> Dict[str, str]:
-    pkg = atc_encode(text)
-    carriers = pkg["carriers"]
-    style_bytes = base64.b64decode(pkg["style_b64"])
-
-    # Build ext alphabet
-    base_keys = set(BASE_ALPHABET.keys())
-    ext_chars = []
-    for ch in carriers:
-        if ch not in base_keys and ch not in ext_chars:
-            ext_chars.append(ch)
+@lru_cache(maxsize=256)
+def _tables(ext: str):
+    """Symbol -> carrier tables for an ext alphabet: a char list and a codepoint array."""
+    chars = _BASE_CHARS + list(ext)
+    return chars, np.array([ord(ch) for ch in chars], dtype="<u4")
+
+def _new_ext(carriers: str, known) -> List[str]:
+    return [ch for ch in dict.fromkeys(carriers) if ch not in known]
+
+def _ext_map(ext_list) -> Dict[str, int]:
     base_size = len(BASE_ALPHABET)
-    ext_map = {ch: base_size + i for i, ch in enumerate(ext_chars)}
-
-    # Streams
-    car_syms = list(_to_symbols(carriers, ext_map))
-    # style components
-    spaces = []; puncts = []; caps = []
-    for b in style_bytes:
-        s = b & 0b11
-        p = (b >> 2) & 0b111
-        c = (b >> 5) & 0b1
-        spaces.append(s); puncts.append(p); caps.append(c)
-
-    # Bit-pack carriers at 6 bits (covers up to 64 symbols)
-    car_packed = pack_bits(car_syms, 6)
-    # Bit-pack styles at 6 bits (2+3+1) by recombining as 6-bit codes
-    style_syms = [ (spaces[i] | (puncts[i]<<2) | (caps[i]<<5)) for i in range(len(spaces)) ]
-    sty_packed = pack_bits(style_syms, 6)
-
-    # Concatenate and compress
-    header = {
-        "format": "ATC-BITZ-v1",
-        "n": len(style_syms),
-        "ext": "".join(ext_chars),
-        "car_len": len(car_packed),
-        "sty_len": len(sty_packed)
-    }
-    payload = car_packed + sty_packed
-    comp = zlib.compress(payload, level=9)
+    return {ch: base_size + i for i, ch in enumerate(ext_list)}
+
+# ATC-BITZ-v2 streams: symbols are renumbered by descending frequency and packed at a width
+# that divides a byte (zlib matches aligned streams far better than 5/6-bit ones). The most
+# frequent 2**w - 1 symbols are coded directly; the all-ones code escapes to a second
+# stream holding the remaining ranks, so a handful of rare chars do not widen every symbol.
+WIDTHS = (1, 2, 4, 8, 16, 32)
+ESCAPE_RATE = 1 / 64  # widest share of escaped symbols tolerated before widening
+
+def _fit_width(k: int) -> int:
+    return next(w for w in WIDTHS if k <= 1 << w)
+
+def _choose_width(ranked_counts: np.ndarray, n: int) -> int:
+    for w in WIDTHS:
+        if ranked_counts.size <= 1 << w or n - int(ranked_counts[:(1 << w) - 1].sum()) <= n * ESCAPE_RATE:
+            return w
+
+def _put_ranked(out: bytearray, syms: np.ndarray, nsym: int):
+    """Append rank table | width | direct codes | escaped ranks for `syms` in [0, nsym)."""
+    counts = np.bincount(syms, minlength=nsym)
+    order = np.argsort(-counts, kind="stable")
+    order = order[counts[order] > 0]
+    w = _choose_width(counts[order], syms.size)
+    rank = np.zeros(nsym, dtype=np.int64)
+    rank[order] = np.arange(order.size)
+    codes = rank[syms]
+    write_varint(out, order.size)
+    for s in order.tolist():
+        write_varint(out, s)
+    out.append(w)
+    esc = (1 << w) - 1
+    if order.size > 1 << w:
+        out += pack_bits_np(np.minimum(codes, esc), w)
+        out += pack_bits_np(codes[codes >= esc] - esc, _fit_width(order.size - esc))
+    else:
+        out += pack_bits_np(codes, w)
+
+def _get_ranked(raw, off: int, n: int):
+    k, off = read_varint(raw, off)
+    order = np.zeros(k, dtype=np.int64)
+    for i in range(k):
+        order[i], off = read_varint(raw, off)
+    w = raw[off]; off += 1
+    nb = (n * w + 7) // 8
+    codes = unpack_bits_np(raw[off:off+nb], n, w).astype(np.int64); off += nb
+    if k > 1 << w:
+        esc = (1 << w) - 1
+        m = codes == esc
+        ne = int(m.sum()); rw = _fit_width(k - esc); nb = (ne * rw + 7) // 8
+        codes[m] += unpack_bits_np(raw[off:off+nb], ne, rw); off += nb
+    return order[codes], off
+
+def _symbol_array(carriers: str, ext_map) -> np.ndarray:
+    cps = np.frombuffer(carriers.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    uniq, inv = np.unique(cps, return_inverse=True)
+    table = np.array(list(_to_symbols("".join(map(chr, uniq.tolist())), ext_map)), dtype=np.int64)
+    return table[inv.reshape(-1)]
+
+def _encode(text: str, layout: str):
+    """(carriers, style bytes, whitespace stream or None) for the chosen style layout."""
+    if layout == WS_LAYOUT:
+        return encode_ws(text)
+    if layout != "atc":
+        raise ValueError(f"Unknown layout: {layout!r} (expected one of {LAYOUTS})")
+    return (*atc_encode_raw(text), None)
+
+def _pack_one(carriers: str, style_bytes: bytes, ext: str, ext_map, b64: bool = True,
+              backend: str = backends.DEFAULT, ws=None, raw: Optional[bytearray] = None) -> Dict:
+    """`raw` is a scratch buffer that batch callers reuse across items."""
+    n = len(style_bytes)
+    if n < RANK_MIN and ws is None and len(BASE_ALPHABET) + len(ext_map) <= 64 \
+            and backend != backends.AUTO and backends.resolve(backend) == backends.DEFAULT:
+        car_packed = pack_bits_py(_to_symbols(carriers, ext_map), 6)
+        sty_packed = pack_bits_py(style_bytes, 6)
+        header = {"format": "ATC-BITZ-v1", "n": n, "ext": ext,
+                  "car_len": len(car_packed), "sty_len": len(sty_packed)}
+        _, comp = backends.compress(car_packed + sty_packed)
+    else:
+        raw = bytearray() if raw is None else raw
+        del raw[:]
+        _put_ranked(raw, _symbol_array(carriers, ext_map), len(BASE_ALPHABET) + len(ext_map))
+        _put_ranked(raw, np.frombuffer(style_bytes, dtype=np.uint8), 64)
+        if ws is not None:
+            raw += ws
+        name, comp = backends.compress(bytes(raw), backend)
+        header = {"format": FORMAT, "n": n, "ext": ext, "backend": name}
+        if ws is not None:
+            header["layout"] = WS_LAYOUT
+    if not b64:
+        return {"header": header, "data": comp}
     return {
         "header": header,
         "data_b64": base64.b64encode(comp).decode("ascii")
     }
 
-def unpack(obj: Dict[str, str]) -> str:
+def _unpack_one(obj: Dict, ext: str) -> str:
     header = obj["header"]
+    assert header["format"] in FORMATS
     n = int(header["n"])
-    ext_chars = list(header.get("ext",""))
-    car_len = int(header["car_len"])
-    comp = base64.b64decode(obj["data_b64"])
-    payload = zlib.decompress(comp)
-    car_packed = payload[:car_len]
-    sty_packed = payload[car_len:]
-
-    car_syms = unpack_bits(car_packed, n, 6)
-    style_syms = unpack_bits(sty_packed, n, 6)
-    # split style syms
-    spaces = [ s & 0b11 for s in style_syms ]
-    puncts = [ (s>>2) & 0b111 for s in style_syms ]
-    caps   = [ (s>>5) & 0b1 for s in style_syms ]
-
-    carriers = _to_carriers(car_syms, ext_chars)
-
-    # rebuild style bytes
-    style_bytes = bytearray(n)
-    for i in range(n):
-        b = (spaces[i] & 0b11) | ((puncts[i] & 0b111)<<2) | ((caps[i] & 0b1)<<5)
-        style_bytes[i] = b
-
-    pkg = {
-        "carriers": carriers,
-        "style_b64": base64.b64encode(bytes(style_bytes)).decode("ascii")
-    }
-    return atc_decode(pkg)
+    raw = backends.decompress(payload(obj), header.get("backend", backends.DEFAULT))
+    if header["format"] == "ATC-BITZ-v1":  # fixed 6-bit carriers and styles
+        car_len = int(header["car_len"])
+        chars = _tables(ext)[0]
+        carriers = "".join([chars[s] for s in unpack_bits_py(raw[:car_len], n, 6)])
+        return decode_raw(carriers, bytes(unpack_bits_py(raw[car_len:], n, 6)))
+    car_syms, off = _get_ranked(raw, 0, n)
+    style_bytes, off = _get_ranked(raw, off, n)
+    carriers = _tables(ext)[1][car_syms].tobytes().decode("utf-32-le", "surrogatepass")
+    if header.get("layout") == WS_LAYOUT:
+        return decode_ws(carriers, style_bytes.astype(np.uint8), raw[off:])
+    return decode_raw(carriers, style_bytes.astype(np.uint8))
+
+def pack(text: str, backend: str = backends.DEFAULT, layout: str = "atc") -> Dict[str, str]:
+    """`backend` is a name from atc.backends.BACKENDS, a preset (fast/balanced/max) or "auto";
+    `layout="ws"` codes whitespace runs in their own stream and round-trips text exactly."""
+    carriers, style_bytes, ws = _encode(text, layout)
+    ext_chars = _new_ext(carriers, BASE_ALPHABET)
+    return _pack_one(carriers, style_bytes, "".join(ext_chars), _ext_map(ext_chars), backend=backend, ws=ws)
+
+def unpack(obj: Dict[str, str]) -> str:
+    return _unpack_one(obj, obj["header"].get("ext",""))
+
+def pack_many(texts: Sequence[str], shared_ext: bool = False, b64: bool = True,
+              backend: str = backends.DEFAULT, layout: str = "atc"):
+    """Pack many texts; with `shared_ext` the ext alphabet is stored once for the batch."""
+    encoded = [_encode(t, layout) for t in texts]
+    raw = bytearray()
+    if shared_ext:
+        batch_ext = _new_ext("".join(c for c, _, _ in encoded), BASE_ALPHABET)
+        ext_map = _ext_map(batch_ext)
+        items = [_pack_one(car, sty, "", ext_map, b64, backend, ws, raw) for car, sty, ws in encoded]
+        return {"format": BATCH_FORMAT, "ext": "".join(batch_ext), "items": items}
+    maps = {}
+    out = []
+    for car, sty, ws in encoded:
+        ext = "".join(_new_ext(car, BASE_ALPHABET))
+        if ext not in maps:
+            maps[ext] = _ext_map(ext)
+        out.append(_pack_one(car, sty, ext, maps[ext], b64, backend, ws, raw))
+    return out
+
+def unpack_many(objs) -> List[str]:
+    """Inverse of pack_many; accepts a list of packages or a shared-ext batch object."""
+    shared = ""
+    if isinstance(objs, dict):
+        assert objs["format"] == BATCH_FORMAT
+        shared = objs["ext"]; objs = objs["items"]
+    return [_unpack_one(obj, shared + obj["header"].get("ext", "")) for obj in objs]
@@ -3,10 +3,13 @@
 ATC CLI - compress
 Usage:
   python -m atc.compress input.txt output.atc
+
+Writes the binary ATC frame (see atc.binfmt).
 """
-import sys, json
+import sys
 from pathlib import Path
 from .codec_ac import pack as atc_pack
+from .binfmt import dumps
 
 def main():
     if len(sys.argv) != 3:
@@ -16,7 +19,7 @@ def main():
     outp = Path(sys.argv[2])
     text = inp.read_text(encoding="utf-8")
     obj = atc_pack(text)
-    outp.write_text(json.dumps(obj), encoding="utf-8")
+    outp.write_bytes(dumps(obj))
     print(f"Wrote {outp} ({outp.stat().st_size} bytes)")
 
 if __name__ == "__main__":
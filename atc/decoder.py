@@ -1,12 +1,40 @@
-import argparse, base64, json, sys
-from typing import Dict, List
-from .utils import unpack_style_bytes, parse_style_byte, CODE2PUNCT
+import argparse, json, sys
+from typing import Dict, List, Union
+import numpy as np
+from .utils import unpack_style_bytes, parse_style_byte, payload, CODE2PUNCT, VECTOR_MIN
 
 ZERO_WIDTH = "\u200b"
+ENGINES = ("py", "table", "auto")
 
-def decode(pkg: Dict[str, str]) -> str:
-    carriers = pkg["carriers"]
-    style_bytes = unpack_style_bytes(base64.b64decode(pkg["style_b64"]))
+# 64-entry tables over style-byte values: prefix spaces, punct suffix codepoint (0 = none), cap flag
+_SPACES = np.zeros(64, dtype=np.uint8)
+_SUFFIX = np.zeros(64, dtype=np.uint32)
+_CAP = np.zeros(64, dtype=bool)
+for _b in range(64):
+    _sp, _pc, _cap = parse_style_byte(_b)
+    _p = CODE2PUNCT.get(_pc)
+    _SPACES[_b] = _sp
+    _SUFFIX[_b] = ord(_p) if _p is not None else 0
+    _CAP[_b] = bool(_cap)
+
+StyleLike = Union[bytes, bytearray, memoryview, np.ndarray]
+
+def decode(pkg: Dict[str, str], engine: str = "py") -> str:
+    return decode_raw(pkg["carriers"], payload(pkg, "style"), engine=engine)
+
+def decode_raw(carriers: str, style: StyleLike, engine: str = "auto") -> str:
+    """Decode from carriers and raw style bytes (no package dict, no base64). Every engine
+    gives the same text; "auto" takes the loop below VECTOR_MIN carriers and the tables above."""
+    if engine == "auto":
+        engine = "table" if len(carriers) >= VECTOR_MIN else "py"
+    if engine == "table":
+        return decode_table(carriers, style)
+    if engine != "py":
+        raise ValueError(f"Unknown engine: {engine!r} (expected one of {ENGINES})")
+    return _decode_loop(carriers, style)
+
+def _decode_loop(carriers: str, style: StyleLike) -> str:
+    style_bytes = unpack_style_bytes(bytes(style))
     if len(carriers) != len(style_bytes):
         raise ValueError("Length mismatch: carriers vs style bytes")
 
@@ -21,12 +49,63 @@ def decode(pkg: Dict[str, str]) -> str:
             out.append(punct)
     return "".join(out)
 
+def _upper_carriers(cps: np.ndarray):
+    up = cps.copy()
+    lower = (cps >= 97) & (cps <= 122)
+    up[lower] -= 32
+    wide = cps >= 128
+    if wide.any():
+        uniq = np.unique(cps[wide])
+        mapped = []
+        for c in uniq.tolist():
+            uc = chr(c).upper()
+            if len(uc) != 1:
+                return None  # uppercasing changes length (e.g. U+00DF)
+            mapped.append(ord(uc))
+        up[wide] = np.asarray(mapped, dtype=np.uint32)[np.searchsorted(uniq, cps[wide])]
+    return up
+
+def decode_table(carriers: str, style: StyleLike) -> str:
+    """Bulk decode from carriers and raw style bytes (no base64), via the 64-entry style tables."""
+    if isinstance(style, np.ndarray):
+        sty = style.astype(np.uint8, copy=False)
+    else:
+        sty = np.frombuffer(style, dtype=np.uint8)
+    cps = np.frombuffer(carriers.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    if cps.size != sty.size:
+        raise ValueError("Length mismatch: carriers vs style bytes")
+    sty = sty & 0b111111
+
+    sp = _SPACES[sty]
+    suffix = _SUFFIX[sty]
+    has_ch = cps != ord(ZERO_WIDTH)
+    has_pu = suffix != 0
+    counts = sp + has_ch + has_pu                        # at most 5 chars per style byte
+    idx = np.int32 if 5 * cps.size < 2**31 else np.int64
+    offsets = np.cumsum(counts, dtype=idx) - counts
+
+    capped = _CAP[sty] & has_ch
+    chars = cps
+    if capped.any():
+        up = _upper_carriers(cps[capped])
+        if up is None:
+            return _decode_loop(carriers, sty.tobytes())
+        chars = cps.copy()
+        chars[capped] = up
+
+    out = np.full(int(counts.sum(dtype=np.int64)), 32, dtype="<u4")
+    pos = offsets + sp
+    out[pos[has_ch]] = chars[has_ch]
+    out[(pos + has_ch)[has_pu]] = suffix[has_pu]
+    return out.tobytes().decode("utf-32-le", "surrogatepass")
+
 def main():
     ap = argparse.ArgumentParser(description="ATC decoder")
     ap.add_argument("--in", dest="infile", type=str, default="-", help="JSON input path or '-'")
+    ap.add_argument("--engine", choices=ENGINES, default="py", help="Decode engine")
     args = ap.parse_args()
     pkg = json.load(sys.stdin if args.infile in ("-", None) else open(args.infile, "r", encoding="utf-8"))
-    print(decode(pkg))
+    print(decode(pkg, engine=args.engine))
 
 if __name__ == "__main__":
     main()
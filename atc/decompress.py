@@ -3,10 +3,13 @@
 ATC CLI - decompress
 Usage:
   python -m atc.decompress input.atc output.txt
+
+Reads binary ATC frames as well as legacy JSON packages.
 """
 import sys, json
 from pathlib import Path
-from .codec_ac import unpack as atc_unpack
+from .binfmt import is_binary, load
+from .cli import unpack_any
 
 def main():
     if len(sys.argv) != 3:
@@ -14,8 +17,10 @@ def main():
         sys.exit(1)
     inp = Path(sys.argv[1])
     outp = Path(sys.argv[2])
-    obj = json.loads(inp.read_text(encoding="utf-8"))
-    text = atc_unpack(obj)
+    with open(inp, "rb") as f:
+        binary = is_binary(f.read(4))
+    obj = load(str(inp)) if binary else json.loads(inp.read_text(encoding="utf-8"))
+    text = unpack_any(obj)
     outp.write_text(text, encoding="utf-8")
     print(f"Wrote {outp} ({outp.stat().st_size} bytes)")
 
@@ -1,12 +1,36 @@
 import argparse, base64, json, sys
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from collections import deque
-from .utils import make_style_byte, pack_style_bytes, PUNCT2CODE
+import numpy as np
+from .utils import make_style_byte, pack_style_bytes, PUNCT2CODE, VECTOR_MIN
 
 PUNCT_SET = set([".", ",", "!", "?", ";", ":"])
 ZERO_WIDTH = "\u200b"  # zero-width carrier
+ENGINES = ("py", "numpy", "auto")
 
-def encode(text: str) -> Dict[str, str]:
+# codepoint -> punct code lookup for the vectorized engine (0 = not punct)
+_PUNCT_LUT = np.zeros(128, dtype=np.uint8)
+for _p in PUNCT_SET:
+    _PUNCT_LUT[ord(_p)] = PUNCT2CODE[_p]
+
+def encode(text: str, engine: str = "py") -> Dict[str, str]:
+    carriers, style = encode_raw(text, engine=engine)
+    style_b64 = base64.b64encode(style).decode("ascii")
+    return {"carriers": carriers, "style_b64": style_b64}
+
+def encode_raw(text: str, engine: str = "auto") -> Tuple[str, bytes]:
+    """Carriers and raw style bytes, without the base64 package wrapping. Every engine gives
+    the same output; "auto" takes the loop below VECTOR_MIN chars and numpy above."""
+    if engine == "auto":
+        engine = "numpy" if len(text) >= VECTOR_MIN else "py"
+    if engine == "numpy":
+        carriers, style = _encode_arrays_np(text)
+        return carriers, style.tobytes()
+    if engine != "py":
+        raise ValueError(f"Unknown engine: {engine!r} (expected one of {ENGINES})")
+    return _encode_loop(text)
+
+def _encode_loop(text: str) -> Tuple[str, bytes]:
     carriers: List[str] = []
     style_bytes: List[int] = []
     spaces_queue = deque()
@@ -64,20 +88,102 @@ def encode(text: str) -> Dict[str, str]:
         last_carrier_idx = len(style_bytes) - 1
         i += 1
 
-    carriers_str = "".join(carriers)
-    style_b64 = base64.b64encode(pack_style_bytes(style_bytes)).decode("ascii")
-    return {"carriers": carriers_str, "style_b64": style_b64}
+    return "".join(carriers), pack_style_bytes(style_bytes)
+
+def _lower_carriers(cps: np.ndarray):
+    # per-character str.lower(), as the loop engine does; ASCII handled in bulk
+    low = cps.copy()
+    upper = (cps >= 65) & (cps <= 90)
+    low[upper] += 32
+    wide = cps >= 128
+    if wide.any():
+        uniq = np.unique(cps[wide])
+        mapped = []
+        for c in uniq.tolist():
+            lc = chr(c).lower()
+            if len(lc) != 1:
+                return None  # lowering changes length (e.g. U+0130); not array-representable
+            mapped.append(ord(lc))
+        low[wide] = np.asarray(mapped, dtype=np.uint32)[np.searchsorted(uniq, cps[wide])]
+    return low
+
+def _encode_arrays_np(text: str) -> Tuple[str, np.ndarray]:
+    cp = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    n = cp.size
+    idx = np.int32 if n < 2**31 else np.int64      # per-position counters: half the memory of int64
+    is_sp = cp == 32
+    pcode = np.zeros(n, dtype=np.uint8)
+    ascii_ = cp < 128
+    pcode[ascii_] = _PUNCT_LUT[cp[ascii_]]
+    is_pu = pcode > 0
+    is_ch = ~(is_sp | is_pu)
+
+    ch_pos = np.flatnonzero(is_ch)
+    m = ch_pos.size
+    low = _lower_carriers(cp[ch_pos])
+    if low is None:
+        carriers, style = _encode_loop(text)
+        return carriers, np.frombuffer(style, dtype=np.uint8)
+
+    # spaces accumulated since the previous carrier (punctuation does not reset the queue);
+    # trailing spaces after the last carrier are never flushed
+    sp_at = np.cumsum(is_sp, dtype=idx)[ch_pos].astype(np.int64)
+    spaces = np.diff(sp_at, prepend=0)
+    chunks = (spaces + 2) // 3                     # queue entries of up to 3 spaces
+    last_chunk = np.where(spaces > 0, spaces - 3 * (chunks - 1), 0)
+    extra_zw = np.maximum(chunks - 1, 0)           # leading chunks flushed as zero-width carriers
+
+    # punctuation runs: first punct of a run attaches to the last carrier, if any
+    prev_pu = np.concatenate(([False], is_pu[:-1]))
+    run_start = is_pu & ~prev_pu
+    ch_cum = np.cumsum(is_ch, dtype=idx)
+    attached = run_start & (ch_cum > 0)
+
+    # number of output carriers produced at each input position
+    counts = np.zeros(n, dtype=idx)
+    counts[is_pu] = 1
+    counts[attached] = 0
+    counts[ch_pos] = extra_zw + 1
+    offsets = np.cumsum(counts, dtype=idx) - counts
+    total = int(counts.sum(dtype=np.int64))
+
+    # default fill is the space-flush carrier: ZERO_WIDTH with 3 spaces
+    out_cp = np.full(total, ord(ZERO_WIDTH), dtype="<u4")
+    style = np.full(total, 3, dtype=np.uint8)
+
+    pu_zw = np.flatnonzero(is_pu & ~attached)
+    style[offsets[pu_zw]] = pcode[pu_zw] << 2
+
+    # attached punct: a later run on the same carrier overwrites an earlier one
+    att_pos = np.flatnonzero(attached)
+    owner = ch_cum[att_pos] - 1
+    keep = np.append(owner[1:] != owner[:-1], True) if owner.size else owner.astype(bool)
+    ch_punct = np.zeros(m, dtype=np.uint8)
+    ch_punct[owner[keep]] = pcode[att_pos[keep]]
+
+    caps = ((cp[ch_pos] >= 65) & (cp[ch_pos] <= 90)).astype(np.uint8)
+    dst = offsets[ch_pos] + extra_zw
+    out_cp[dst] = low
+    style[dst] = last_chunk.astype(np.uint8) | (ch_punct << 2) | (caps << 5)
+
+    carriers = out_cp.tobytes().decode("utf-32-le", "surrogatepass")
+    return carriers, style
+
+def encode_np(text: str) -> Dict[str, str]:
+    """Vectorized engine: same package as ``encode(text)``, built with array ops."""
+    return encode(text, engine="numpy")
 
 def main():
     ap = argparse.ArgumentParser(description="ATC encoder")
     ap.add_argument("--text", type=str, help="Input text")
     ap.add_argument("--infile", type=str, help="Read text from file")
     ap.add_argument("--out", type=str, default="-", help="Write JSON to path or '-'")
+    ap.add_argument("--engine", choices=ENGINES, default="py", help="Encode engine")
     args = ap.parse_args()
     if (args.text is None) == (args.infile is None):
         print("Provide exactly one of --text or --infile", file=sys.stderr); sys.exit(1)
     text = args.text if args.text is not None else open(args.infile, "r", encoding="utf-8").read()
-    pkg = encode(text)
+    pkg = encode(text, engine=args.engine)
     out_json = json.dumps(pkg, ensure_ascii=False, indent=2)
     if args.out == "-" or args.out is None:
         print(out_json)
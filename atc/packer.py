@@ -1,16 +1,21 @@
 
 import base64, json
 from typing import Dict, List
-from .encoder import encode as atc_encode
-from .decoder import decode as atc_decode
-from .utils import unpack_style_bytes, parse_style_byte
-from .rc import Model, RangeEncoder, RangeDecoder
+from .encoder import encode_raw as atc_encode_raw
+from .decoder import decode_raw
+from .utils import payload, join_style, split_style
+from .rc import Model, RangeEncoder, RangeDecoder, PackedRangeEncoder, PackedRangeDecoder
 
 ZERO_WIDTH = "\u200b"
 
 BASE_ALPHABET = {**{chr(ord('a')+i): i for i in range(26)},
                  **{str(i): 26+i for i in range(10)},
                  ZERO_WIDTH: 36}
+# v1 wrote one 0x00/0xFF byte per coded bit; v2 packs the same bits 8 per byte
+CODERS = {"ATC-AC-v1": (RangeEncoder, RangeDecoder),
+          "ATC-AC-v2": (PackedRangeEncoder, PackedRangeDecoder)}
+DEFAULT_FORMAT = "ATC-AC-v2"
+
 def _rev_base():
     return {v:k for k,v in BASE_ALPHABET.items()}
 
@@ -37,10 +42,10 @@ def _symbols_to_carriers(symbols: List[int], ext_list: List[str]) -> str:
             out.append(ext_list[idx])
     return "".join(out)
 
-def pack(text: str) -> Dict[str, str]:
-    pkg = atc_encode(text)
-    carriers = pkg["carriers"]
-    style_bytes = base64.b64decode(pkg["style_b64"])
+def pack(text: str, fmt: str = DEFAULT_FORMAT) -> Dict[str, str]:
+    if fmt not in CODERS:
+        raise ValueError(f"Unsupported pack format: {fmt!r}")
+    carriers, style_bytes = atc_encode_raw(text)
 
     # Build dynamic extension alphabet for any carriers not in base
     ext_chars = []
@@ -52,13 +57,10 @@ def pack(text: str) -> Dict[str, str]:
     ext_map = {ch: base_size + i for i, ch in enumerate(ext_chars)}
 
     # Split style bits
-    spaces, puncts, caps = [], [], []
-    for b in style_bytes:
-        s, p, c = parse_style_byte(b)
-        spaces.append(s); puncts.append(p); caps.append(c)
+    spaces, puncts, caps = (a.tolist() for a in split_style(style_bytes))
 
     # Arithmetic-code each stream adaptively
-    enc = RangeEncoder()
+    enc = CODERS[fmt][0]()
     # carriers
     m_car = Model(base_size + len(ext_chars))
     for s in _carriers_to_symbols(carriers, ext_map):
@@ -75,19 +77,19 @@ def pack(text: str) -> Dict[str, str]:
 
     blob = enc.finish()
     return {
-        "format": "ATC-AC-v1",
+        "format": fmt,
         "n": len(style_bytes),
         "ext": "".join(ext_chars),  # store extension chars as a string
         "data_b64": base64.b64encode(blob).decode("ascii")
     }
 
 def unpack(packed: Dict[str, str]) -> str:
-    assert packed["format"] == "ATC-AC-v1"
+    assert packed["format"] in CODERS
     n = int(packed["n"])
     ext_chars = list(packed.get("ext", ""))
-    data = base64.b64decode(packed["data_b64"])
+    data = payload(packed)
 
-    dec = RangeDecoder(data)
+    dec = CODERS[packed["format"]][1](data)
     base_size = len(BASE_ALPHABET)
     # carriers (n)
     m_car = Model(base_size + len(ext_chars))
@@ -102,11 +104,4 @@ def unpack(packed: Dict[str, str]) -> str:
     m_ca = Model(2)
     caps = [dec.decode_symbol(m_ca) for _ in range(n)]
 
-    # rebuild style bytes
-    style_bytes = bytearray(n)
-    for i in range(n):
-        b = (spaces[i] & 0b11) | ((puncts[i] & 0b111)<<2) | ((caps[i] & 0b1)<<5)
-        style_bytes[i] = b
-
-    pkg = {"carriers": carriers, "style_b64": base64.b64encode(bytes(style_bytes)).decode("ascii")}
-    return atc_decode(pkg)
+    return decode_raw(carriers, join_style(spaces, puncts, caps))
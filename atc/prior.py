@@ -0,0 +1,91 @@
+"""
+Pretrained priors for the adaptive ATC models (codec_ac).
+
+Short messages never let Laplace-initialized models warm up; a prior seeds the
+carrier, space, punct and caps models with frequencies learned from a sample corpus,
+and carries the static word dictionary used by the word mode (ATC-ACW-v1).
+Usage:
+  acs-atc-train-prior --in corpus1.txt corpus2.txt --out chat.prior.json
+"""
+import argparse, json, zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List
+from .encoder import encode_raw as atc_encode_raw
+from .codec_ac import BASE_ALPHABET, ENDER_CODES, _words, frequent_words
+
+FORMAT = "ATC-PRIOR-v1"
+DEFAULT_TOTAL = 2048   # seeded model totals stay well under Model.max_total so they keep adapting
+DEFAULT_MAX_EXT = 256
+DEFAULT_MAX_WORDS = 1024
+TABLES = ("carriers", "spaces", "puncts", "caps", "caps_ender")
+
+def _scale(counts: List[int], total: int) -> List[int]:
+    s = sum(counts)
+    if s == 0:
+        return [1]*len(counts)
+    room = max(0, total - len(counts))
+    return [1 + c * room // s for c in counts]
+
+def prior_id(prior: Dict) -> int:
+    """Stable nonzero 32-bit ID over the prior's alphabet and tables."""
+    keys = ("ext",) + TABLES + (("words",) if "words" in prior else ())
+    body = json.dumps({k: prior[k] for k in keys}, sort_keys=True, ensure_ascii=False)
+    return zlib.crc32(body.encode("utf-8")) or 1
+
+def train(texts: Iterable[str], total: int = DEFAULT_TOTAL, max_ext: int = DEFAULT_MAX_EXT,
+          max_words: int = DEFAULT_MAX_WORDS) -> Dict:
+    car = {}; spaces = [0]*4; puncts = [0]*8; caps = [0]*2; caps_ender = [0]*2; words = []
+    for text in texts:
+        carriers, style = atc_encode_raw(text)
+        for ch in carriers:
+            car[ch] = car.get(ch, 0) + 1
+        words += _words(carriers, style)
+        prev_p = 0
+        for b in style:
+            p = (b >> 2) & 0b111; c = (b >> 5) & 1
+            spaces[b & 0b11] += 1; puncts[p] += 1
+            (caps_ender if prev_p in ENDER_CODES else caps)[c] += 1
+            prev_p = p
+    ext = sorted((ch for ch in car if ch not in BASE_ALPHABET), key=lambda ch: (-car[ch], ch))[:max_ext]
+    base = sorted(BASE_ALPHABET, key=BASE_ALPHABET.get)
+    prior = {"format": FORMAT, "ext": "".join(ext),
+             "carriers": _scale([car.get(ch, 0) for ch in base + ext], total),
+             "spaces": _scale(spaces, total), "puncts": _scale(puncts, total),
+             "caps": _scale(caps, total), "caps_ender": _scale(caps_ender, total)}
+    if max_words:
+        prior["words"] = frequent_words(words, max_words)
+    prior["id"] = prior_id(prior)
+    return prior
+
+def save_prior(prior: Dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(prior, f, ensure_ascii=False)
+
+@lru_cache(maxsize=None)
+def load_prior(path: str) -> Dict:
+    """Load (and cache) a prior file; raises ValueError if it is not a valid prior."""
+    with open(path, "r", encoding="utf-8") as f:
+        prior = json.load(f)
+    if prior.get("format") != FORMAT:
+        raise ValueError(f"Not an ATC prior file: {path}")
+    if prior_id(prior) != prior.get("id"):
+        raise ValueError(f"Prior ID mismatch (corrupted prior?): {path}")
+    return prior
+
+def train_main(argv=None):
+    ap = argparse.ArgumentParser(description="Train ATC model priors from a sample corpus")
+    ap.add_argument("--in", dest="infiles", nargs="+", required=True, help="UTF-8 text files")
+    ap.add_argument("--out", required=True, help="Output prior JSON path")
+    ap.add_argument("--total", type=int, default=DEFAULT_TOTAL, help="Seeded total per model")
+    ap.add_argument("--max_ext", type=int, default=DEFAULT_MAX_EXT, help="Max non-base carrier chars")
+    ap.add_argument("--max_words", type=int, default=DEFAULT_MAX_WORDS,
+                    help="Static word dictionary size for the word mode (0 = none)")
+    args = ap.parse_args(argv)
+    texts = (open(p, "r", encoding="utf-8").read() for p in args.infiles)
+    prior = train(texts, total=args.total, max_ext=args.max_ext, max_words=args.max_words)
+    save_prior(prior, args.out)
+    print(f"Wrote {args.out} (id={prior['id']:08x}, ext={len(prior['ext'])}, "
+          f"words={len(prior.get('words', ()))})")
+
+if __name__ == "__main__":
+    train_main()
@@ -0,0 +1,125 @@
+
+# Interleaved multi-lane rANS with static frequency tables (byte-wise renormalization).
+# Symbol i is coded on lane i % lanes; all lanes advance together as NumPy vectors,
+# so the Python-level loop runs n / lanes times instead of n times.
+import numpy as np
+from .utils import write_varint, read_varint
+
+RANS_L = 1<<23          # lower bound of the normalized state interval [L, L<<8)
+MAX_SCALE_BITS = 22     # RANS_L >> scale_bits must stay >= 1; 1<<22 slots cover all of Unicode
+
+def _scale_bits(nsym: int) -> int:
+    """Table precision for `nsym` present symbols: at least 4 slots each, within 12..22 bits."""
+    return min(MAX_SCALE_BITS, max(12, int(nsym).bit_length() + 2))
+
+def normalize_freqs(counts: np.ndarray, scale_bits: int) -> np.ndarray:
+    """Scale counts to sum to 1<<scale_bits, keeping every present symbol >= 1."""
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    M = 1 << scale_bits
+    freq = np.zeros(counts.size, dtype=np.int64)
+    if total == 0:
+        return freq
+    present = counts > 0
+    if int(present.sum()) > M:
+        raise ValueError(f"{int(present.sum())} symbols do not fit a {scale_bits}-bit table")
+    freq[present] = np.maximum(1, counts[present] * M // total)
+    diff = M - int(freq.sum())
+    while diff < 0:
+        k = int(np.argmax(freq))
+        take = min(-diff, int(freq[k]) - 1)
+        freq[k] -= take; diff += take
+    freq[int(np.argmax(freq))] += diff
+    return freq
+
+def encode_stream(syms: np.ndarray, nsym: int, lanes: int = 32) -> bytes:
+    """Code `syms` (ints in [0, nsym)) with a static table; returns table + lane states + lane bytes."""
+    syms = np.asarray(syms, dtype=np.int64)
+    n = syms.size
+    counts = np.bincount(syms, minlength=nsym)
+    sb = _scale_bits(np.count_nonzero(counts))
+    freq = normalize_freqs(counts, sb)
+    start = np.concatenate(([0], np.cumsum(freq)[:-1]))
+
+    head = bytearray([sb])
+    write_varint(head, nsym)
+    for f in freq.tolist():
+        write_varint(head, f)
+
+    steps = -(-n // lanes)
+    cap = steps * 3 + 4
+    out = np.zeros((lanes, cap), dtype=np.uint8)
+    pos = np.zeros(lanes, dtype=np.int64)
+    x = np.full(lanes, RANS_L, dtype=np.uint64)
+    lane_idx = np.arange(lanes)
+    xmax_base = np.uint64((RANS_L >> sb) << 8)
+    f64 = freq.astype(np.uint64); c64 = start.astype(np.uint64); usb = np.uint64(sb)
+
+    # rANS is LIFO: encode the last step first, decoder then reads forward
+    for t in range(steps - 1, -1, -1):
+        row = syms[t*lanes:(t+1)*lanes]
+        k = row.size
+        f = f64[row]; c = c64[row]
+        xs = x[:k]
+        x_max = xmax_base * f
+        while True:
+            m = xs >= x_max
+            if not m.any():
+                break
+            li = lane_idx[:k][m]
+            out[li, pos[li]] = (xs[m] & np.uint64(0xFF)).astype(np.uint8)
+            pos[li] += 1
+            xs[m] >>= np.uint64(8)
+        x[:k] = ((xs // f) << usb) + (xs % f) + c
+
+    body = bytearray()
+    lens = bytearray()
+    for li in range(lanes):
+        body += out[li, :pos[li]][::-1].tobytes()
+        write_varint(lens, int(pos[li]))
+    states = x.astype("<u4").tobytes()
+    return bytes(head) + states + bytes(lens) + bytes(body)
+
+def decode_stream(buf, off: int, n: int, lanes: int = 32):
+    """Inverse of encode_stream; returns (symbols ndarray, offset past the stream)."""
+    sb = buf[off]; off += 1
+    nsym, off = read_varint(buf, off)
+    freq = np.zeros(nsym, dtype=np.int64)
+    for i in range(nsym):
+        freq[i], off = read_varint(buf, off)
+    start = np.concatenate(([0], np.cumsum(freq)[:-1]))
+    # slot -> symbol lookup over the scaled range
+    lut = np.repeat(np.arange(nsym, dtype=np.int64), freq)
+
+    x = np.frombuffer(bytes(buf[off:off + 4*lanes]), dtype="<u4").astype(np.uint64); off += 4*lanes
+    lens = []
+    for _ in range(lanes):
+        ln, off = read_varint(buf, off); lens.append(ln)
+    cap = max(lens) if lens else 0
+    data = np.zeros((lanes, cap + 1), dtype=np.uint64)
+    for li, ln in enumerate(lens):
+        data[li, :ln] = np.frombuffer(bytes(buf[off:off+ln]), dtype=np.uint8); off += ln
+    rpos = np.zeros(lanes, dtype=np.int64)
+
+    out = np.zeros(n, dtype=np.int64)
+    mask = np.uint64((1 << sb) - 1); usb = np.uint64(sb)
+    f64 = freq.astype(np.uint64); c64 = start.astype(np.uint64)
+    lane_idx = np.arange(lanes)
+    steps = -(-n // lanes)
+    L = np.uint64(RANS_L); eight = np.uint64(8)
+    for t in range(steps):
+        k = min(lanes, n - t*lanes)
+        xs = x[:k]
+        slot = xs & mask
+        s = lut[slot.astype(np.int64)]
+        out[t*lanes:t*lanes+k] = s
+        xs = f64[s] * (xs >> usb) + slot - c64[s]
+        while True:
+            m = xs < L
+            if not m.any():
+                break
+            li = lane_idx[:k][m]
+            xs[m] = (xs[m] << eight) | data[li, rpos[li]]
+            rpos[li] += 1
+        x[:k] = xs
+    return out, off
@@ -1,7 +1,9 @@
 
 # Minimal adaptive arithmetic coder (integer, 32-bit range)
 # Based on order-0 frequency model with 1-count initialization (Laplace).
+from bisect import bisect_right
 from typing import List
+from .arith import BitWriter, BitReader
 
 TOP = (1<<32) - 1
 HALF = 1<<31
@@ -90,11 +92,10 @@ class RangeDecoder:
         self.pos = 0
         self.low = 0
         self.high = TOP
-        # Read first byte as proxy for bit; since we wrote 0x00/0xFF per bit, treat 0xFF as 1
+        # Preload 32 code bits (one 0x00/0xFF byte per bit in the legacy format)
         self.code = 0
-        # To keep consistent with our naive "bit" bytes, preload 32 bits worth
-        for _ in range(4):
-            self.code = (self.code<<8) | self._read_byte()
+        for _ in range(32):
+            self.code = (self.code<<1) | self._get_bit()
 
     def _read_byte(self):
         if self.pos >= len(self.data):
@@ -114,14 +115,8 @@ class RangeDecoder:
         # Map code into cumulative interval
         value = ((self.code - self.low + 1)*total - 1) // range_
 
-        # Find symbol
-        # Linear search (alphabet small): ok
-        lo, hi = 0, model.n - 1
-        sym = hi
-        for s in range(model.n):
-            if model.cum[s+1] > value >= model.cum[s]:
-                sym = s
-                break
+        # Find symbol: binary search over the cumulative table
+        sym = min(bisect_right(model.cum, value, 0, model.n) - 1, model.n - 1)
 
         low_count = model.cum[sym]
         high_count = model.cum[sym+1]
@@ -150,3 +145,26 @@ class RangeDecoder:
 
         model.update(sym)
         return sym
+
+class PackedRangeEncoder(RangeEncoder):
+    """Same coder as RangeEncoder, but output bits are packed 8 per byte."""
+    def __init__(self):
+        super().__init__()
+        self.bw = BitWriter()
+
+    def _emit_bit_plus_underflow(self, bit):
+        self.bw.write_bit(bit)
+        self.bw.write_pending(bit, self.underflow)
+        self.underflow = 0
+
+    def finish(self):
+        super().finish()
+        return self.bw.flush()
+
+class PackedRangeDecoder(RangeDecoder):
+    def __init__(self, data: bytes):
+        self.br = BitReader(data)
+        super().__init__(data)
+
+    def _get_bit(self):
+        return self.br.read_bit()
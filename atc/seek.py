@@ -0,0 +1,97 @@
+
+# Seekable ATC format: one byte-wise range-coded stream with carrier, space, punct and cap
+# symbols interleaved per carrier, plus periodic checkpoints holding the decoder and model
+# state so a character range can be decoded starting from the nearest checkpoint.
+import base64, struct
+from bisect import bisect_right
+from typing import Dict
+import numpy as np
+from .encoder import encode_raw as atc_encode_raw
+from .decoder import decode_raw
+from .utils import payload
+from .arith import ByteRangeEncoder, ByteRangeDecoder
+from .codec_ac import BASE_ALPHABET, ENDER_CODES, ZERO_WIDTH, _models, _to_symbols, _to_carriers
+
+FORMAT = "ATC-SEEK-v1"
+DEFAULT_SPACING = 4096  # carriers between checkpoints
+_CP_HEAD = struct.Struct("<IIIIIB")  # carrier idx, char offset, byte pos, range, code, prev punct
+
+def _decode_step(dec, ms, prev_p):
+    c = dec.decode(ms[0]); s = dec.decode(ms[1]); p = dec.decode(ms[2])
+    cap = dec.decode(ms[4] if prev_p in ENDER_CODES else ms[3])
+    return c, s | (p << 2) | (cap << 5), p
+
+def _out_len(sym: int, style: int) -> int:
+    p = (style >> 2) & 0b111
+    return (style & 0b11) + (sym != BASE_ALPHABET[ZERO_WIDTH]) + (0 < p < 7)
+
+def _snapshot(dec, ms, i, off, prev_p) -> bytes:
+    head = _CP_HEAD.pack(i, off, dec.pos, dec.range, dec.code, prev_p)
+    return head + b"".join(np.asarray(m.freq, dtype="<u2").tobytes() for m in ms)
+
+def _restore(data: bytes, rec: bytes, ms):
+    i, off, pos, rng, code, prev_p = _CP_HEAD.unpack_from(rec, 0)
+    dec = ByteRangeDecoder(data)
+    dec.pos = pos; dec.range = rng; dec.code = code
+    o = _CP_HEAD.size
+    for m in ms:
+        m.freq = np.frombuffer(rec, dtype="<u2", count=m.n, offset=o).tolist(); o += 2*m.n
+        m._rebuild()
+    return dec, i, off, prev_p
+
+def pack(text: str, spacing: int = DEFAULT_SPACING) -> Dict:
+    if spacing < 1:
+        raise ValueError("spacing must be >= 1")
+    carriers, style_bytes = atc_encode_raw(text)
+    ext_chars = [ch for ch in dict.fromkeys(carriers) if ch not in BASE_ALPHABET]
+    base_size = len(BASE_ALPHABET)
+    ext_map = {ch: base_size + i for i, ch in enumerate(ext_chars)}
+    nsym = base_size + len(ext_chars)
+    syms = list(_to_symbols(carriers, ext_map))
+
+    enc = ByteRangeEncoder(); ms = _models(nsym); prev_p = 0
+    for c, b in zip(syms, style_bytes):
+        p = (b >> 2) & 0b111
+        enc.encode(ms[0], c); enc.encode(ms[1], b & 0b11); enc.encode(ms[2], p)
+        enc.encode(ms[4] if prev_p in ENDER_CODES else ms[3], (b >> 5) & 1)
+        prev_p = p
+    data = enc.finish()
+
+    # decoder-side pass to capture checkpoint states
+    dec = ByteRangeDecoder(data); ms = _models(nsym); prev_p = 0; off = 0
+    cps = []
+    for i in range(len(syms)):
+        if i % spacing == 0:
+            cps.append(_snapshot(dec, ms, i, off, prev_p))
+        c, style, prev_p = _decode_step(dec, ms, prev_p)
+        off += _out_len(c, style)
+    return {"format": FORMAT, "n": len(syms), "ext": "".join(ext_chars), "spacing": spacing,
+            "n_chars": off, "checkpoints_b64": base64.b64encode(b"".join(cps)).decode("ascii"),
+            "data_b64": base64.b64encode(data).decode("ascii")}
+
+def _decode_from(ms, dec, i, n, prev_p, need: int, ext_chars):
+    syms = []; styles = bytearray(); got = 0
+    while i < n and got < need:
+        c, style, prev_p = _decode_step(dec, ms, prev_p)
+        syms.append(c); styles.append(style); got += _out_len(c, style); i += 1
+    return decode_raw(_to_carriers(syms, ext_chars), bytes(styles))
+
+def unpack(obj: Dict) -> str:
+    return decode_range(obj, 0, int(obj["n_chars"]))
+
+def decode_range(obj: Dict, a: int, b: int) -> str:
+    """Decoded text[a:b], starting from the last checkpoint at or before a."""
+    assert obj["format"] == FORMAT
+    n = int(obj["n"]); n_chars = int(obj["n_chars"]); ext_chars = list(obj.get("ext", ""))
+    a = max(0, min(a, n_chars)); b = max(a, min(b, n_chars))
+    if a == b:
+        return ""
+    data = payload(obj)
+    cps = payload(obj, "checkpoints")
+    ms = _models(len(BASE_ALPHABET) + len(ext_chars))
+    stride = _CP_HEAD.size + 2 * sum(m.n for m in ms)
+    offs = [_CP_HEAD.unpack_from(cps, k)[1] for k in range(0, len(cps), stride)]
+    k = bisect_right(offs, a) - 1
+    dec, i, off, prev_p = _restore(data, cps[k*stride:(k+1)*stride], ms)
+    text = _decode_from(ms, dec, i, n, prev_p, b - off, ext_chars)
+    return text[a - off:b - off]
@@ -1,4 +1,17 @@
-from typing import List
+import base64
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+import numpy as np
+
+def payload(obj, key: str = "data"):
+    """Raw payload bytes from a package: `key` (bytes/memoryview, as loaded from the binary
+    format) or the base64 `key_b64` field of the JSON form."""
+    raw = obj.get(key)
+    return raw if raw is not None else base64.b64decode(obj[key + "_b64"])
+
+# texts (or carrier counts) below this go through the Python loops: at message sizes the
+# fixed cost of the numpy engines outweighs their per-char speed
+VECTOR_MIN = 256
 
 PUNCT2CODE = {None: 0, ".": 1, ",": 2, "!": 3, "?": 4, ";": 5, ":": 6}
 CODE2PUNCT = {v: k for k, v in PUNCT2CODE.items()}
@@ -19,8 +32,66 @@ def parse_style_byte(b: int):
     capitalize_self = (b >> 5) & 0b1
     return spaces_before, punct_after_code, capitalize_self
 
+def join_style(spaces, puncts, caps) -> np.ndarray:
+    """Style bytes (uint8 array) from the three field streams; vectorized make_style_byte."""
+    sp = np.asarray(spaces, dtype=np.uint8); pu = np.asarray(puncts, dtype=np.uint8)
+    return (sp & 0b11) | ((pu & 0b111) << 2) | ((np.asarray(caps, dtype=np.uint8) & 0b1) << 5)
+
+def split_style(style):
+    """(spaces, puncts, caps) uint8 arrays from style bytes; vectorized parse_style_byte."""
+    sty = style if isinstance(style, np.ndarray) else np.frombuffer(style, dtype=np.uint8)
+    return sty & 0b11, (sty >> 2) & 0b111, (sty >> 5) & 0b1
+
 def pack_style_bytes(bytes_list: List[int]) -> bytes:
     return bytes(bytes_list)
 
 def unpack_style_bytes(blob: bytes) -> List[int]:
     return list(blob)
+
+def write_varint(out: bytearray, v: int):
+    while True:
+        b = v & 0x7F; v >>= 7
+        if v:
+            out.append(b | 0x80)
+        else:
+            out.append(b); return
+
+def read_varint(buf, off: int):
+    shift = 0; v = 0
+    while True:
+        b = buf[off]; off += 1
+        v |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return v, off
+        shift += 7
+
+def write_varints_np(values) -> bytes:
+    """LEB128 varints for an array of non-negative ints, same bytes as repeated write_varint."""
+    v = np.asarray(values, dtype=np.uint64)
+    nb = np.ones(v.size, dtype=np.int64)
+    for k in range(1, 10):
+        nb += v >= np.uint64(1 << (7 * k))
+    idx = np.repeat(np.arange(v.size), nb)
+    k = np.arange(idx.size) - np.repeat(np.cumsum(nb) - nb, nb)
+    out = (v[idx] >> (7 * k).astype(np.uint64)) & np.uint64(0x7F)
+    out |= (k < nb[idx] - 1).astype(np.uint64) << np.uint64(7)
+    return out.astype(np.uint8).tobytes()
+
+def read_varints_np(buf) -> np.ndarray:
+    """Decode every varint in `buf` (which must end on a complete varint) as uint64."""
+    b = np.frombuffer(buf, dtype=np.uint8).astype(np.uint64)
+    if not b.size:
+        return np.zeros(0, dtype=np.uint64)
+    last = (b & np.uint64(0x80)) == 0
+    ends = np.flatnonzero(last)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    k = np.arange(b.size) - np.repeat(starts, ends - starts + 1)
+    vals = (b & np.uint64(0x7F)) << (7 * k).astype(np.uint64)
+    return np.add.reduceat(vals, starts)
+
+def run_jobs(fn, jobs, workers: Optional[int] = None) -> list:
+    """[fn(j) for j in jobs], on a process pool unless workers == 1 or there is one job."""
+    if workers == 1 or len(jobs) <= 1:
+        return [fn(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(fn, jobs))
@@ -0,0 +1,152 @@
+
+# Whitespace-run layout ("ws") for the ATC style layer.
+#
+# Same carriers + 6-bit style bytes as the base layout, but whitespace never becomes a
+# carrier: bits 0-1 of a style byte name the gap before the symbol (none, one space, one
+# newline, or the next run of the whitespace stream), and every run of spaces, tabs and
+# newlines other than those single characters is run-length coded in a separate stream:
+#
+#   varint segment count per coded run (plus one for the trailing run, possibly empty)
+#   | per segment: varint length * 3 + kind (0 space, 1 tab, 2 newline)
+#
+# The layout is lossless: punctuation only attaches to a carrier it directly follows, case
+# is folded only where upper() restores the original char, and a literal U+200B is kept as
+# a capped zero-width carrier.
+from typing import Tuple
+import numpy as np
+from .encoder import _PUNCT_LUT, ZERO_WIDTH
+from .decoder import _SUFFIX, _upper_carriers
+from .utils import write_varints_np, read_varints_np
+
+LAYOUT = "ws"
+GAP_NONE, GAP_SPACE, GAP_RUN, GAP_NEWLINE = 0, 1, 2, 3
+_KIND = np.zeros(128, dtype=np.int64)
+_KIND[9], _KIND[10] = 1, 2
+_KIND_CHARS = np.array([32, 9, 10], dtype="<u4")
+_ZW = ord(ZERO_WIDTH)
+
+def _fold_case(cps: np.ndarray):
+    """(carrier codepoints, cap flags); a char is folded only if upper() gives it back."""
+    low = cps.copy()
+    cap = (cps >= 65) & (cps <= 90)
+    low[cap] += 32
+    wide = cps >= 128
+    if wide.any():
+        uniq = np.unique(cps[wide])
+        mapped = []; capped = []
+        for c in uniq.tolist():
+            lc = chr(c).lower()
+            fold = len(lc) == 1 and lc != chr(c) and lc.upper() == chr(c)
+            mapped.append(ord(lc) if fold else c); capped.append(fold)
+        at = np.searchsorted(uniq, cps[wide])
+        low[wide] = np.asarray(mapped, dtype=np.uint32)[at]
+        cap[wide] = np.asarray(capped, dtype=bool)[at]
+    cap |= cps == _ZW  # literal zero-width char
+    return low, cap
+
+def encode_ws(text: str) -> Tuple[str, np.ndarray, bytes]:
+    """Carriers, style bytes and the run-length whitespace stream for `text`."""
+    cp = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    n = cp.size
+    is_ws = (cp == 32) | (cp == 9) | (cp == 10)
+    pcode = np.zeros(n, dtype=np.uint8)
+    ascii_ = cp < 128
+    pcode[ascii_] = _PUNCT_LUT[cp[ascii_]]
+    is_pu = pcode > 0
+    is_ch = ~(is_ws | is_pu)
+    attached = is_pu & np.concatenate(([False], is_ch[:-1]))
+    is_sym = is_ch | (is_pu & ~attached)
+
+    # gap before each symbol: the whitespace since the previous non-whitespace char
+    nw = np.flatnonzero(~is_ws)
+    prev_nw = np.concatenate(([-1], nw[:-1]))
+    keep = is_sym[nw]
+    pos = nw[keep]
+    gap_len = (nw - prev_nw - 1)[keep]
+    first = cp[prev_nw[keep] + 1]
+    gap = np.full(pos.size, GAP_RUN, dtype=np.uint8)
+    gap[gap_len == 0] = GAP_NONE
+    gap[(gap_len == 1) & (first == 32)] = GAP_SPACE
+    gap[(gap_len == 1) & (first == 10)] = GAP_NEWLINE
+
+    sym_ch = is_ch[pos]
+    out_cp = np.full(pos.size, _ZW, dtype="<u4")
+    low, cap = _fold_case(cp[pos[sym_ch]])
+    out_cp[sym_ch] = low
+    caps = np.zeros(pos.size, dtype=np.uint8)
+    caps[sym_ch] = cap
+    punct = pcode[pos]                                  # punctuation symbols
+    own = np.flatnonzero(sym_ch & (pos + 1 < n))
+    own = own[attached[pos[own] + 1]]                   # carriers with punct right after
+    punct[own] = pcode[pos[own] + 1]
+    style = gap | (punct << 2) | (caps << 5)
+    return out_cp.tobytes().decode("utf-32-le", "surrogatepass"), style, _ws_stream(cp, is_ws)
+
+def _ws_stream(cp: np.ndarray, is_ws: np.ndarray) -> bytes:
+    W = np.flatnonzero(is_ws)
+    if not W.size:
+        return write_varints_np([0])
+    new_run = np.concatenate(([True], W[1:] != W[:-1] + 1))
+    new_seg = new_run | np.concatenate(([True], cp[W[1:]] != cp[W[:-1]]))
+    run_id = np.cumsum(new_run) - 1
+    run_starts = np.flatnonzero(new_run)
+    run_len = np.diff(np.append(run_starts, W.size))
+    coded = (run_len > 1) | (cp[W[run_starts]] == 9)
+    trailing = W[-1] == cp.size - 1
+    coded[-1] |= trailing
+    seg_starts = np.flatnonzero(new_seg)
+    seg_len = np.diff(np.append(seg_starts, W.size))
+    seg_run = run_id[seg_starts]
+    ks = np.bincount(seg_run, minlength=run_len.size)[coded]
+    if not trailing:
+        ks = np.append(ks, 0)
+    sel = coded[seg_run]
+    vals = seg_len[sel] * 3 + _KIND[cp[W[seg_starts[sel]]]]
+    return write_varints_np(np.concatenate((ks, vals)))
+
+def decode_ws(carriers: str, style, ws) -> str:
+    """Inverse of encode_ws."""
+    sty = np.asarray(style, dtype=np.uint8) if isinstance(style, np.ndarray) \
+        else np.frombuffer(style, dtype=np.uint8)
+    cps = np.frombuffer(carriers.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    if cps.size != sty.size:
+        raise ValueError("Length mismatch: carriers vs style bytes")
+    gap = sty & 0b11
+    cap = (sty >> 5 & 1).astype(bool)
+
+    vals = read_varints_np(ws).astype(np.int64)
+    R = int(np.count_nonzero(gap == GAP_RUN)) + 1
+    ks, segs = vals[:R], vals[R:]
+    seg_len, seg_kind = segs // 3, segs % 3
+    seg_run = np.repeat(np.arange(R), ks)
+    run_len = np.bincount(seg_run, weights=seg_len, minlength=R).astype(np.int64)
+
+    glen = ((gap == GAP_SPACE) | (gap == GAP_NEWLINE)).astype(np.int64)
+    glen[gap == GAP_RUN] = run_len[:-1]
+    has_ch = (cps != _ZW) | cap
+    suffix = _SUFFIX[sty & 0b111111]
+    has_pu = suffix != 0
+    counts = glen + has_ch + has_pu
+    offsets = np.cumsum(counts) - counts
+    body = int(counts.sum())
+    out = np.zeros(body + int(run_len[-1]), dtype="<u4")
+
+    out[offsets[gap == GAP_SPACE]] = 32
+    out[offsets[gap == GAP_NEWLINE]] = 10
+    run_dest = np.append(offsets[gap == GAP_RUN], body)
+    char_run = np.repeat(seg_run, seg_len)
+    within = np.arange(char_run.size) - np.repeat(np.cumsum(run_len) - run_len, run_len)
+    out[run_dest[char_run] + within] = np.repeat(_KIND_CHARS[seg_kind], seg_len)
+
+    chars = cps
+    up = cap & (cps != _ZW)
+    if up.any():
+        chars = cps.copy()
+        upper = _upper_carriers(cps[up])
+        if upper is None:
+            raise ValueError("Corrupt ws-layout package: capped carrier has no single-char upper case")
+        chars[up] = upper
+    at = offsets + glen
+    out[at[has_ch]] = chars[has_ch]
+    out[(at + has_ch)[has_pu]] = suffix[has_pu]
+    return out.tobytes().decode("utf-32-le", "surrogatepass")
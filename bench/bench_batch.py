@@ -0,0 +1,52 @@
+import sys, time, random, csv, argparse
+from pathlib import Path
+
+# Repo imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from atc import codec_ac, codec_simple
+
+def log_lines(n: int, seed: int = 0):
+    """Synthetic ~40-char log lines (the short-message case the batch APIs target)."""
+    rng = random.Random(seed)
+    verbs = ["Login", "Logout", "Upload", "Retry", "Sync", "Backup"]
+    states = ["ok", "FAILED", "timed out", "queued", "done"]
+    return [f"{rng.choice(verbs)} {rng.choice(states)} for user {rng.randint(1, 9999)}, "
+            f"took {rng.randint(1, 999)}ms{rng.choice('.!?')}" for _ in range(n)]
+
+def rate(fn, n: int, repeat: int) -> float:
+    best = min(_timed(fn) for _ in range(repeat))
+    return n / best
+
+def _timed(fn) -> float:
+    t0 = time.process_time(); fn(); return time.process_time() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=str, default=None, help="Text file, one message per line (default: synthetic log lines)")
+    ap.add_argument("--n", type=int, default=3000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out_csv", type=str, default=None)
+    args = ap.parse_args()
+    msgs = Path(args.lines).read_text(encoding="utf-8").splitlines()[:args.n] if args.lines else log_lines(args.n)
+    rows = []
+    for name, mod in (("atc_arith", codec_ac), ("atc_bitpack", codec_simple)):
+        single = [mod.pack(m) for m in msgs]
+        batch = mod.pack_many(msgs)
+        ok = mod.unpack_many(batch) == [mod.unpack(o) for o in single]
+        rows.append({"codec": name, "mode": "loop",
+                     "pack_msgs_s": rate(lambda: [mod.pack(m) for m in msgs], len(msgs), args.repeat),
+                     "unpack_msgs_s": rate(lambda: [mod.unpack(o) for o in single], len(msgs), args.repeat), "ok": ok})
+        rows.append({"codec": name, "mode": "batch",
+                     "pack_msgs_s": rate(lambda: mod.pack_many(msgs), len(msgs), args.repeat),
+                     "unpack_msgs_s": rate(lambda: mod.unpack_many(batch), len(msgs), args.repeat), "ok": ok})
+    for r in rows:
+        print(f"{r['codec']:12s} {r['mode']:5s} pack {r['pack_msgs_s']:9.0f} msgs/s  unpack {r['unpack_msgs_s']:9.0f} msgs/s  ok={r['ok']}")
+    if args.out_csv:
+        with open(args.out_csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=["codec", "mode", "pack_msgs_s", "unpack_msgs_s", "ok"])
+            w.writeheader()
+            w.writerows(rows)
+        print(f"Wrote {args.out_csv}")
+
+if __name__ == "__main__":
+    main()
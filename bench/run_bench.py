@@ -1,5 +1,5 @@
 
-import os, sys, time, gzip, io, base64, json, csv, argparse
+import os, sys, time, gzip, io, base64, csv, argparse
 from pathlib import Path
 
 # Optional imports
@@ -17,6 +17,7 @@ except Exception:
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from atc.codec_simple import pack as atc_pack_z, unpack as atc_unpack_z
 from atc.codec_ac import pack as atc_pack_ac, unpack as atc_unpack_ac
+from atc.binfmt import dumps as atc_dumps
 
 def size_utf8(b: bytes) -> int:
     return len(b)
@@ -76,10 +77,10 @@ def main():
             t2 = time.perf_counter(); raw_zs = zstd_decompress(zs); t3 = time.perf_counter()
             rows.append({"file": name, "codec": "zstd", "size": len(zs), "enc_ms": (t1-t0)*1000, "dec_ms": (t3-t2)*1000, "ok": raw_zs == raw})
 
-        # ATC (bitpack+zlib): store JSON blob for size and decode
+        # ATC (bitpack+zlib): store binary frame for size and decode
         t0 = time.perf_counter()
         obj_z = atc_pack_z(raw.decode("utf-8"))
-        blob_z = json.dumps(obj_z).encode("utf-8")
+        blob_z = atc_dumps(obj_z)
         t1 = time.perf_counter()
         t2 = time.perf_counter()
         text_z = atc_unpack_z(obj_z)
@@ -87,10 +88,10 @@ def main():
         t3 = time.perf_counter()
         rows.append({"file": name, "codec": "atc_bitpack", "size": len(blob_z), "enc_ms": (t1-t0)*1000, "dec_ms": (t3-t2)*1000, "ok": raw_atc_z == raw})
 
-        # ATC (arithmetic): store JSON blob for size and decode
+        # ATC (arithmetic): store binary frame for size and decode
         t0 = time.perf_counter()
         obj_ac = atc_pack_ac(raw.decode("utf-8"))
-        blob_ac = json.dumps(obj_ac).encode("utf-8")
+        blob_ac = atc_dumps(obj_ac)
         t1 = time.perf_counter()
         t2 = time.perf_counter()
         text_ac = atc_unpack_ac(obj_ac)
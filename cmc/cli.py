@@ -1,27 +1,50 @@
 import argparse, json, sys, numpy as np
-from .one_d import encode_1d, decode_1d
+from .one_d import encode_1d, decode_1d, MODES
 from .two_d import encode_2d, decode_2d
+from . import binfmt
+
+def _add_format_args(ap):
+    ap.add_argument("--format", choices=("json", "bin"), default="json", help="Output framing")
+    ap.add_argument("--quant_err", type=float,
+                    help="bin: round anchor values to within this (default max_err/2; 0 = float32)")
+    ap.add_argument("--codec", choices=binfmt.CODECS, default=binfmt.DEFAULT_CODEC, help="bin: body compressor")
+
+def _write(pkg, args):
+    if args.format == "bin":
+        quant_err = args.max_err / 2 if args.quant_err is None else args.quant_err
+        binfmt.dump(pkg, args.out, quant_err=quant_err, codec=args.codec)
+    else:
+        json.dump(pkg, open(args.out, "w"))
+
+def _read(path):
+    """JSON or binary package, auto-detected."""
+    with open(path, "rb") as f:
+        is_bin = binfmt.is_binary(f.read(4))
+    return binfmt.load(path) if is_bin else json.load(open(path, "r"))
 
 def encode_1d_main(argv=None):
     ap = argparse.ArgumentParser(description="CMC encode 1D")
     ap.add_argument("--in", dest="infile", required=True, help="Input .npy (float array)")
     ap.add_argument("--tau", type=float, default=0.01)
     ap.add_argument("--max_err", type=float, default=0.01)
-    ap.add_argument("--out", required=True, help="Output JSON path")
+    ap.add_argument("--mode", choices=MODES, default="greedy",
+                    help="Anchor selection (swing/optimal bound the error at every sample)")
+    ap.add_argument("--out", required=True, help="Output path")
+    _add_format_args(ap)
     args = ap.parse_args(argv)
     x = np.load(args.infile).astype(np.float32)
-    pkg = encode_1d(x, tau=args.tau, max_err=args.max_err)
-    json.dump(pkg, open(args.out, "w"))
+    pkg = encode_1d(x, tau=args.tau, max_err=args.max_err, mode=args.mode)
+    _write(pkg, args)
 
 def decode_1d_main(argv=None):
     ap = argparse.ArgumentParser(description="CMC decode 1D")
-    ap.add_argument("--in", dest="infile", required=True, help="Input JSON package")
+    ap.add_argument("--in", dest="infile", required=True, help="Input package (JSON or binary)")
     ap.add_argument("--n", type=int, required=True, help="Number of samples to reconstruct")
     ap.add_argument("--alpha", type=float, default=0.2)
     ap.add_argument("--mu", type=float, default=0.01)
     ap.add_argument("--out", required=True, help="Output .npy")
     args = ap.parse_args(argv)
-    pkg = json.load(open(args.infile, "r"))
+    pkg = _read(args.infile)
     y = decode_1d(pkg, n=args.n, alpha=args.alpha, mu=args.mu)
     np.save(args.out, y)
 
@@ -30,21 +53,22 @@ def encode_2d_main(argv=None):
     ap.add_argument("--in", dest="infile", required=True, help="Input .npy (N,2) float array")
     ap.add_argument("--tau_rad", type=float, default=0.05)
     ap.add_argument("--max_err", type=float, default=0.01)
-    ap.add_argument("--out", required=True, help="Output JSON path")
+    ap.add_argument("--out", required=True, help="Output path")
+    _add_format_args(ap)
     args = ap.parse_args(argv)
     pts = np.load(args.infile).astype(np.float32)
     pkg = encode_2d(pts, tau_rad=args.tau_rad, max_err=args.max_err)
-    json.dump(pkg, open(args.out, "w"))
+    _write(pkg, args)
 
 def decode_2d_main(argv=None):
     ap = argparse.ArgumentParser(description="CMC decode 2D paths")
-    ap.add_argument("--in", dest="infile", required=True, help="Input JSON package")
+    ap.add_argument("--in", dest="infile", required=True, help="Input package (JSON or binary)")
     ap.add_argument("--m", type=int, required=True, help="Number of points to reconstruct")
     ap.add_argument("--alpha", type=float, default=0.2)
     ap.add_argument("--mu", type=float, default=0.01)
     ap.add_argument("--out", required=True, help="Output .npy")
     args = ap.parse_args(argv)
-    pkg = json.load(open(args.infile, "r"))
+    pkg = _read(args.infile)
     out = decode_2d(pkg, m=args.m, alpha=args.alpha, mu=args.mu)
     import numpy as np
     np.save(args.out, out)
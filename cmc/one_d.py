@@ -1,5 +1,12 @@
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+from .binfmt import anchor_arrays, anchor_list
+
+ENGINES = ("py", "numpy")
+MODES = ("greedy", "swing", "optimal")
+_WINDOW = 16  # first error-scan window per gap; doubles while no anchor is found
+_SCALAR_AFTER = 8  # a gap that has placed this many error anchors finishes in the scalar scan
+_SCALAR_TAIL = 2  # the vector decoder hands segments to the scalar loop once this few are left
 
 def _select_anchors_1d(x: np.ndarray, tau: float = 0.01, max_err: float = 0.01):
     n = len(x)
@@ -30,9 +37,218 @@ def _select_anchors_1d(x: np.ndarray, tau: float = 0.01, max_err: float = 0.01):
         anchors.append((n-1, float(x[-1])))
     return anchors
 
-def encode_1d(x: np.ndarray, tau: float = 0.01, max_err: float = 0.01) -> Dict[str, Any]:
+def _scan_gap(x: np.ndarray, a: int, ya, lo: int, hi: int, max_err: float) -> List[int]:
+    """Error anchors among candidates [lo, hi) of a curvature-free gap, from anchor a with
+    value ya; the same scalar arithmetic as `_select_anchors_1d`."""
+    out = []
+    for i in range(lo, hi):
+        j = i + 1
+        y_lin = ya + (x[j] - ya) * (i - a) / (j - a)
+        if abs(y_lin - x[i]) > max_err:
+            out.append(i); a = i; ya = x[i]
+    return out
+
+def _scan_1d(x: np.ndarray, a0: int, y0, tau: float, max_err: float) -> np.ndarray:
+    """Greedy anchors among the candidates x[1:-1] (indices into x), continuing from the last
+    anchor a0 with value y0; a0 <= 0 may lie before the window.
+
+    Curvature anchors do not depend on the greedy state, so they come from one array pass
+    and split the window into gaps, each starting from a known anchor. The gaps are then
+    scanned in lockstep: per round every open gap tests a window of candidates against the
+    chord from its last anchor, takes the first failing one as a new anchor (and restarts
+    its window there) or doubles its window. Each error anchor costs its gap a round, so a
+    gap dense with them is handed to the scalar scan once it has placed `_SCALAR_AFTER`.
+    """
+    n = len(x)
+    if n < 3:
+        return np.zeros(0, dtype=np.int64)
+    dt = x.dtype.type
+    y0 = dt(y0)
+    curv = np.abs(x[:-2] - 2*x[1:-1] + x[2:])
+    cv = np.flatnonzero(curv >= tau) + 1
+    # gap g covers candidates [lo, hi) after anchor last; the final gap ends at n-1
+    last = np.concatenate(([a0], cv))
+    lo = np.concatenate(([1], cv + 1))
+    hi = np.append(cv, n - 1)
+    open_ = lo < hi
+    last, lo, hi = last[open_], lo[open_], hi[open_]
+    win = np.full(last.size, _WINDOW, dtype=np.int64)
+    hits = np.zeros(last.size, dtype=np.int64)
+    found = [cv]
+    while last.size:
+        w = np.minimum(win, hi - lo)
+        gid = np.repeat(np.arange(last.size), w)
+        i = np.arange(gid.size) - np.repeat(np.cumsum(w) - w, w) + lo[gid]
+        a = last[gid]
+        yi = np.where(a == a0, y0, x[np.maximum(a, 0)])
+        y_lin = yi + (x[i+1] - yi) * (i - a).astype(dt) / (i + 1 - a).astype(dt)
+        hit = np.flatnonzero(np.abs(y_lin - x[i]) > max_err)
+        first = hit[np.concatenate(([True], gid[hit[1:]] != gid[hit[:-1]]))] if hit.size else hit
+        got = np.zeros(last.size, dtype=bool)
+        got[gid[first]] = True
+        found.append(i[first])
+        last = last.copy(); last[got] = i[first]
+        lo = np.where(got, last + 1, lo + w)
+        win = np.where(got, _WINDOW, 2 * win)
+        hits += got
+        dense = (hits >= _SCALAR_AFTER) & (lo < hi)
+        for g in np.flatnonzero(dense).tolist():
+            a = int(last[g])
+            found.append(np.asarray(_scan_gap(x, a, y0 if a == a0 else x[a], int(lo[g]), int(hi[g]), max_err),
+                                    dtype=np.int64))
+        open_ = (lo < hi) & ~dense
+        last, lo, hi, win, hits = last[open_], lo[open_], hi[open_], win[open_], hits[open_]
+    return np.sort(np.concatenate(found))
+
+def _as_float(x) -> np.ndarray:
+    x = np.asarray(x)
+    return x if x.dtype.kind == "f" else x.astype(np.float64)
+
+def _anchor_list(x: np.ndarray, idx: np.ndarray, base: int = 0):
+    return list(zip((idx + base).tolist(), x[idx].astype(np.float64).tolist()))
+
+def _select_anchors_1d_np(x: np.ndarray, tau: float = 0.01, max_err: float = 0.01):
+    """Vectorized engine: the same anchors as `_select_anchors_1d`, float for float."""
+    x = _as_float(x)
+    n = len(x)
+    head = [(0, float(x[0]))]
+    if n < 3:
+        return head + [(n-1, float(x[-1]))] * (n > 1)
+    idx = _scan_1d(x, 0, x[0], tau, max_err)
+    if not idx.size or idx[-1] != n - 1:
+        idx = np.append(idx, n - 1)
+    return head + _anchor_list(x, idx)
+
+def _cone(x: np.ndarray, a: int, hi: int, max_err: float):
+    """Endpoints j in (a, hi) and whether the chord x[a] -> x[j] stays within max_err of every
+    sample between them, plus the index of the first endpoint past which the cone of
+    admissible slopes is empty (len if it never empties in this window)."""
+    j = np.arange(a + 1, hi)
+    d = (j - a).astype(np.float64)
+    dy = x[a+1:hi] - x[a]
+    s = dy / d
+    U = np.minimum.accumulate((dy + max_err) / d)   # upper slope bound over samples a+1..j
+    L = np.maximum.accumulate((dy - max_err) / d)
+    ok = np.ones(j.size, dtype=bool)
+    ok[1:] = (s[1:] <= U[:-1]) & (s[1:] >= L[:-1])
+    empty = np.flatnonzero(L > U)
+    return j, ok, int(empty[0]) + 1 if empty.size else j.size
+
+def _reach(xf: np.ndarray, a: int, max_err: float, w: int):
+    """Admissible endpoints from anchor a, scanning windows from size w until the cone
+    empties or the signal ends; also returns the window size used."""
+    n = len(xf)
+    while True:
+        hi = min(n, a + 1 + w)
+        j, ok, stop = _cone(xf, a, hi, max_err)
+        if stop < j.size or hi == n:
+            return j[:stop][ok[:stop]], w
+        w *= 2
+
+def _select_anchors_swing(x: np.ndarray, max_err: float = 0.01):
+    """Swing-door (shrinking-cone) selection: the cone of slopes that keep every covered
+    sample within max_err of the chord shrinks as the segment grows; when it empties, the
+    anchor goes on the furthest sample whose chord stayed inside it. Unlike stopping at the
+    first sample outside the cone, one noisy sample does not end the segment. Linear in
+    the samples each cone spans."""
+    x = _as_float(x)
+    xf = x.astype(np.float64)
+    n = len(x)
+    idx = [0]; a = 0
+    while a < n - 1:
+        j, _ = _reach(xf, a, max_err, _WINDOW)
+        a = int(j[-1])
+        idx.append(a)
+    return _anchor_list(x, np.asarray(idx, dtype=np.int64))
+
+def _select_anchors_optimal(x: np.ndarray, max_err: float = 0.01):
+    """Fewest anchors such that linear interpolation between them is within max_err of
+    every sample: shortest path over all chords the cone admits. O(n * reach); meant for
+    offline archives."""
+    x = _as_float(x)
+    xf = x.astype(np.float64)
+    n = len(x)
+    dist = np.full(n, n, dtype=np.int64); dist[0] = 0
+    parent = np.zeros(n, dtype=np.int64)
+    w = _WINDOW
+    for a in range(n - 1):
+        j, w = _reach(xf, a, max_err, max(_WINDOW, w // 2))  # neighbours reach about as far
+        better = j[dist[j] > dist[a] + 1]
+        dist[better] = dist[a] + 1; parent[better] = a
+    path = [n - 1]
+    while path[-1] != 0:
+        path.append(int(parent[path[-1]]))
+    return _anchor_list(x, np.asarray(path[::-1], dtype=np.int64))
+
+class StreamingEncoder1D:
+    """Online `encode_1d`: feed samples with `push`, end with `flush`.
+
+    Keeps only the last anchor and the two samples whose anchor decision still waits for
+    the next sample, so memory is constant and every anchor is emitted one sample after
+    its index (the closing anchor at `flush`). The anchors, in order, are exactly
+    `encode_1d(all samples)["anchors"]`. Each is also passed to `callback`, if given.
+    """
+    def __init__(self, tau: float = 0.01, max_err: float = 0.01, callback=None):
+        self.tau = tau; self.max_err = max_err; self.callback = callback
+        self.n = 0
+        self.last = None                          # (index, value) of the last anchor
+        self.tail = np.zeros(0, dtype=np.float32) # samples from index n - len(tail) on
+
+    def _emit(self, anchors):
+        if self.callback is not None:
+            for a in anchors:
+                self.callback(a)
+        return anchors
+
+    def push(self, samples) -> List[Tuple[int, float]]:
+        """Add samples; returns the anchors they settle."""
+        x = np.atleast_1d(np.asarray(samples, dtype=np.float32))
+        if not x.size:
+            return []
+        out = []
+        if self.last is None:
+            self.last = (0, x[0]); out.append((0, float(x[0])))
+        w = np.concatenate((self.tail, x))
+        base = self.n - self.tail.size           # absolute index of w[0]
+        idx = _scan_1d(w, self.last[0] - base, self.last[1], self.tau, self.max_err)
+        if idx.size:
+            self.last = (int(idx[-1]) + base, w[idx[-1]])
+            out += _anchor_list(w, idx, base)
+        self.n += x.size
+        self.tail = w[-2:].copy()
+        return self._emit(out)
+
+    def flush(self) -> List[Tuple[int, float]]:
+        """Closing anchor at the last sample (if it is not one already)."""
+        if self.last is None or self.last[0] == self.n - 1:
+            return []
+        self.last = (self.n - 1, self.tail[-1])
+        return self._emit([(self.n - 1, float(self.tail[-1]))])
+
+def iter_anchors_1d(chunks: Iterable, tau: float = 0.01, max_err: float = 0.01) -> Iterator[Tuple[int, float]]:
+    """Anchors of the concatenated chunks, yielded as soon as each is settled."""
+    enc = StreamingEncoder1D(tau=tau, max_err=max_err)
+    for chunk in chunks:
+        yield from enc.push(chunk)
+    yield from enc.flush()
+
+def encode_1d(x: np.ndarray, tau: float = 0.01, max_err: float = 0.01, engine: str = "numpy",
+              mode: str = "greedy") -> Dict[str, Any]:
+    """`mode` "swing" or "optimal" bounds the linear-interpolation error by max_err over every
+    sample (tau is unused); "greedy" is the curvature/point-check selector."""
     x = np.asarray(x, dtype=np.float32)
-    anchors = _select_anchors_1d(x, tau=tau, max_err=max_err)
+    if mode == "swing":
+        anchors = _select_anchors_swing(x, max_err=max_err)
+    elif mode == "optimal":
+        anchors = _select_anchors_optimal(x, max_err=max_err)
+    elif mode != "greedy":
+        raise ValueError(f"Unknown mode: {mode!r} (expected one of {MODES})")
+    elif engine == "py":
+        anchors = _select_anchors_1d(x, tau=tau, max_err=max_err)
+    elif engine == "numpy":
+        anchors = _select_anchors_1d_np(x, tau=tau, max_err=max_err)
+    else:
+        raise ValueError(f"Unknown engine: {engine!r} (expected one of {ENGINES})")
     return {"type": "1d", "anchors": anchors}
 
 def _arp_smoother_step(y, target, alpha=0.2, mu=0.01):
@@ -40,21 +256,66 @@ def _arp_smoother_step(y, target, alpha=0.2, mu=0.01):
     e = target - y
     return y + alpha*np.sign(e) - mu*y
 
-def decode_1d(pkg: Dict[str, Any], n: int, alpha: float = 0.2, mu: float = 0.01) -> np.ndarray:
+def _smooth(y, i0, v0, v1, length, t0, t1, alpha, mu):
+    """Scalar ARP recurrence for y[i0+t0 .. i0+t1] of one segment, from y[i0+t0-1]."""
+    for t in range(t0, t1+1):
+        # linear target
+        target = v0 + (v1 - v0) * (t / length)
+        y[i0+t] = _arp_smoother_step(y[i0+t-1], target, alpha=alpha, mu=mu)
+
+def decode_1d(pkg: Dict[str, Any], n: int, alpha: float = 0.2, mu: float = 0.01,
+              engine: str = "numpy") -> np.ndarray:
     assert pkg["type"] == "1d"
-    anchors = pkg["anchors"]
+    if engine == "numpy":
+        return _decode_1d_np(*anchor_arrays(pkg), n, alpha, mu)
+    if engine != "py":
+        raise ValueError(f"Unknown engine: {engine!r} (expected one of {ENGINES})")
+    anchors = anchor_list(pkg)
     anchors = sorted(anchors, key=lambda p: p[0])
     y = np.zeros(n, dtype=np.float32)
 
     for k in range(len(anchors)-1):
         i0, v0 = anchors[k]
         i1, v1 = anchors[k+1]
-        length = max(1, i1 - i0)
-        for t, idx in enumerate(range(i0, i1+1)):
-            # linear target
-            target = v0 + (v1 - v0) * (t / length)
-            if idx == i0:
-                y[idx] = v0
-            else:
-                y[idx] = _arp_smoother_step(y[idx-1], target, alpha=alpha, mu=mu)
+        y[i0] = v0
+        _smooth(y, i0, v0, v1, max(1, i1 - i0), 1, i1 - i0, alpha, mu)
+    return y
+
+def _decode_1d_np(idx: np.ndarray, val: np.ndarray, n: int, alpha: float, mu: float) -> np.ndarray:
+    """Segment-parallel engine, same output as the scalar loop.
+
+    Every segment restarts at its anchor value, so the segments are independent
+    recurrences. Sorted longest first, the segments still running at step t are a prefix,
+    and one array step advances all of them: Python iterations drop from n to the longest
+    segment (with no padding stored). Anchor values are written last, since each one
+    overrides the end of the segment before it.
+    """
+    y = np.zeros(n, dtype=np.float32)
+    if idx.size < 2:
+        return y
+    order = np.argsort(idx, kind="stable")
+    idx, val = idx[order], val[order]
+    steps = idx[1:] - idx[:-1]
+    by_len = np.argsort(-steps, kind="stable")
+    i0, steps = idx[:-1][by_len], steps[by_len]
+    v0 = val[:-1][by_len]; v1 = val[1:][by_len]
+    dv = v1 - v0
+    length = np.maximum(1, steps)
+
+    cur = v0.astype(np.float32)
+    neg = -steps                                     # ascending: segments with steps >= t lead
+    for t in range(1, int(steps[0]) + 1):
+        m = int(np.searchsorted(neg, -t, side="right"))
+        if m <= _SCALAR_TAIL:
+            for k in range(m):
+                y[i0[k] + t - 1] = cur[k]
+                _smooth(y, int(i0[k]), float(v0[k]), float(v1[k]), int(length[k]), t, int(steps[k]), alpha, mu)
+            break
+        target = (v0[:m] + dv[:m] * (t / length[:m])).astype(np.float32)
+        cur = _arp_smoother_step(cur[:m], target, alpha=alpha, mu=mu).astype(np.float32, copy=False)
+        y[i0[:m] + t] = cur
+
+    # later anchors at the same index win, as in the scalar loop
+    last = np.append(idx[1:-1] != idx[:-2], True) if idx.size > 2 else np.ones(1, dtype=bool)
+    y[idx[:-1][last]] = val[:-1][last]
     return y
@@ -1,5 +1,6 @@
 import numpy as np
 from typing import Dict, Any, List, Tuple
+from .binfmt import anchor_list
 
 def _turning_angle(p_prev, p, p_next):
     v1 = p - p_prev
@@ -46,7 +47,7 @@ def _arp_step_2d(prev, target, alpha=0.2, mu=0.01):
 
 def decode_2d(pkg: Dict[str, Any], m: int, alpha: float = 0.2, mu: float = 0.01) -> np.ndarray:
     assert pkg["type"] == "2d"
-    anchors = sorted(pkg["anchors"], key=lambda p: p[0])
+    anchors = sorted(anchor_list(pkg), key=lambda p: p[0])
     out = np.zeros((m, 2), dtype=np.float32)
     for k in range(len(anchors)-1):
         i0, p0 = anchors[k]; p0 = np.array(p0, dtype=np.float32)
@@ -17,3 +17,42 @@ def test_atc_roundtrip():
     # length align
     pkg = encode("Hello,   world!!!  OK?")
     assert len(pkg["carriers"]) == len(base64.b64decode(pkg["style_b64"]))
+
+def test_atc_numpy_engine_matches():
+    import random
+    cases = [
+        "", "   ", "...", "?! leading", "a  ,b", "a. . b", "A    B     C",
+        "Tabs\tand\nnewlines, ÉCOLE café ΣΑΣ 文字 😀!!",
+    ]
+    rng = random.Random(0)
+    alphabet = "aZ .,!?;:\nÉΣ​"
+    cases += ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 40))) for _ in range(300)]
+    for t in cases:
+        assert encode(t, engine="numpy") == encode(t)
+
+def test_atc_table_decoder_matches():
+    from atc.decoder import decode_table
+    cases = [
+        "I am in it, okay?  YES!", "", "?! leading", "A    B     C",
+        "Tabs\tand\nnewlines, ÉCOLE café ΣΑΣ 文字 😀!!",
+    ]
+    for t in cases:
+        pkg = encode(t)
+        ref = decode(pkg)
+        assert decode(pkg, engine="table") == ref
+        style = base64.b64decode(pkg["style_b64"])
+        assert decode_table(pkg["carriers"], memoryview(style)) == ref
+
+def test_atc_raw_entry_points():
+    import numpy as np
+    from atc.encoder import encode_raw
+    from atc.decoder import decode_raw, decode_table
+    from atc.utils import join_style, split_style, make_style_byte
+    for t in ["I am in it, okay?  YES!", "", "Tabs\tand\nnewlines, ÉCOLE café 😀!!"]:
+        carriers, style = encode_raw(t, engine="numpy")
+        ref = decode(encode(t))
+        assert decode_raw(carriers, style) == ref
+        assert decode_table(carriers, join_style(*split_style(style))) == ref
+    sp, pu, ca = [0, 3, 1], [0, 7, 4], [1, 0, 1]
+    assert join_style(sp, pu, ca).tolist() == [make_style_byte(*f) for f in zip(sp, pu, ca)]
+    assert [a.tolist() for a in split_style(np.array([32, 31, 49], dtype=np.uint8))] == [sp, pu, ca]
@@ -14,3 +14,74 @@ def test_cmc_anchor_coverage():
     pkg = encode_1d(x, tau=0.0, max_err=0.0001)
     # should be small number of anchors on straight line
     assert len(pkg["anchors"]) <= 5
+
+def test_cmc_numpy_anchors_match_greedy():
+    from cmc.one_d import _select_anchors_1d
+    rng = np.random.default_rng(0)
+    signals = [np.cumsum(rng.normal(size=500)) * 0.01, np.sin(np.linspace(0, 20, 700)),
+               rng.normal(size=300) * 0.001, np.zeros(1), np.arange(2.0), np.arange(3.0) ** 2]
+    for x in signals:
+        x = x.astype(np.float32)
+        for tau, max_err in ((0.01, 0.01), (0.0, 1e-4), (1.0, 0.001), (10.0, 0.0)):
+            assert encode_1d(x, tau, max_err)["anchors"] == _select_anchors_1d(x, tau, max_err)
+
+def test_cmc_segment_parallel_decode_matches_scalar():
+    rng = np.random.default_rng(1)
+    x = np.cumsum(rng.normal(size=1500)).astype(np.float32) * 0.1
+    pkgs = [encode_1d(x, tau=0.5, max_err=0.01),
+            {"type": "1d", "anchors": [(9, 0.5), (0, 1.0), (5, 2.0), (5, 3.0), (400, -1.0)]}]
+    for pkg in pkgs:
+        assert np.array_equal(decode_1d(pkg, n=1505), decode_1d(pkg, n=1505, engine="py"))
+
+def test_cmc_streaming_encoder_matches_batch():
+    from cmc.one_d import StreamingEncoder1D, iter_anchors_1d
+    rng = np.random.default_rng(2)
+    x = (np.cumsum(rng.normal(size=800)) * 0.05).astype(np.float32)
+    ref = encode_1d(x, tau=0.01, max_err=0.01)["anchors"]
+    chunks = np.split(x, [0, 1, 2, 50, 51, 400])
+    assert list(iter_anchors_1d(chunks, tau=0.01, max_err=0.01)) == ref
+    seen = []
+    enc = StreamingEncoder1D(tau=0.01, max_err=0.01, callback=seen.append)
+    for v in x[:300]:
+        enc.push(v)
+        assert enc.tail.size <= 2
+    enc.push(x[300:]); enc.flush()
+    assert seen == ref
+    assert list(iter_anchors_1d([x[:1]])) == encode_1d(x[:1])["anchors"]
+
+def test_cmc_swing_and_optimal_bound_error():
+    rng = np.random.default_rng(3)
+    x = (np.sin(np.linspace(0, 6, 600)) + rng.normal(size=600) * 0.002).astype(np.float32)
+    counts = {}
+    for mode in ("swing", "optimal"):
+        anchors = encode_1d(x, max_err=0.01, mode=mode)["anchors"]
+        idx, val = zip(*anchors)
+        assert idx[0] == 0 and idx[-1] == len(x) - 1
+        assert np.max(np.abs(np.interp(np.arange(len(x)), idx, val) - x)) <= 0.01 + 1e-6
+        counts[mode] = len(anchors)
+    assert counts["optimal"] <= counts["swing"] < len(encode_1d(x, tau=0.01, max_err=0.01)["anchors"])
+
+def test_cmc_binary_container(tmp_path):
+    from cmc import binfmt
+    from cmc.cli import encode_1d_main, decode_1d_main
+    from cmc.two_d import encode_2d, decode_2d
+    x = np.sin(np.linspace(0, 8*np.pi, 2000)).astype(np.float32)
+    pkg = encode_1d(x, max_err=0.01, mode="swing")
+    idx, val = binfmt.anchor_arrays(pkg)
+    exact = binfmt.loads(binfmt.dumps(pkg))
+    assert np.array_equal(exact["idx"], idx) and np.array_equal(exact["val"], val)
+    assert np.array_equal(decode_1d(exact, n=len(x)), decode_1d(pkg, n=len(x)))
+    q = binfmt.loads(binfmt.dumps(pkg, quant_err=0.005, codec="lzma"))
+    assert np.max(np.abs(q["val"] - val)) <= 0.005
+    pts = np.cumsum(np.random.default_rng(4).normal(size=(300, 2)), axis=0).astype(np.float32)
+    p2 = encode_2d(pts, max_err=0.05)
+    assert np.array_equal(decode_2d(binfmt.loads(binfmt.dumps(p2)), m=300), decode_2d(p2, m=300))
+
+    np.save(tmp_path / "x.npy", x)
+    for fmt in ("json", "bin"):
+        out = tmp_path / f"x.{fmt}"
+        encode_1d_main(["--in", str(tmp_path / "x.npy"), "--mode", "swing", "--format", fmt,
+                        "--quant_err", "0", "--out", str(out)])
+        decode_1d_main(["--in", str(out), "--n", "2000", "--out", str(tmp_path / f"{fmt}.npy")])
+    assert (tmp_path / "x.bin").stat().st_size * 5 < (tmp_path / "x.json").stat().st_size
+    assert np.array_equal(np.load(tmp_path / "bin.npy"), np.load(tmp_path / "json.npy"))
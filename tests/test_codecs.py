@@ -0,0 +1,271 @@
+import random
+from atc.arith import Model, FenwickModel, Encoder, Decoder
+from atc.codec_ac import pack as ac_pack, unpack as ac_unpack
+
+TEXTS = [
+    "I am in it, okay?  YES!",
+    "Hello, world!  This is Adaptive Text Compression.",
+    "Edge cases:   multiple   spaces, punctuation!!! and CAPS.",
+    "Start punctuation?! End...",
+    "",
+    "line one\nline two\ttabbed, 文字 and 😀.",
+]
+
+def _wide_text(k: int = 70000) -> str:
+    """One word of `k` distinct CJK/Hangul carriers: more symbols than a 16-bit table has slots."""
+    cps = list(range(0x4E00, 0xA000)) + list(range(0xAC00, 0xD7A4)) + list(range(0x20000, 0x2A6E0))
+    return "".join(map(chr, cps[:k]))
+
+def test_codec_ac_roundtrip():
+    for t in TEXTS:
+        assert ac_unpack(ac_pack(t)) == t
+
+def test_fenwick_model_matches_model():
+    rng = random.Random(0)
+    for n, max_total in [(2, 1 << 15), (37, 50), (300, 200)]:
+        syms = [rng.randrange(n) if rng.random() < 0.5 else 0 for _ in range(2000)]
+        blobs = []
+        for cls in (Model, FenwickModel):
+            enc = Encoder(); m = cls(n, max_total)
+            for s in syms:
+                enc.encode(m, s)
+            blobs.append(enc.finish())
+        assert blobs[0] == blobs[1]
+        dec = Decoder(blobs[0]); m = FenwickModel(n, max_total)
+        assert [dec.decode(m) for _ in syms] == syms
+
+def test_codec_ac3_byte_coder_roundtrip():
+    for t in TEXTS:
+        obj = ac_pack(t, fmt="ATC-AC3-v1")
+        assert obj["format"] == "ATC-AC3-v1"
+        assert ac_unpack(obj) == t
+
+def test_codec_rans_roundtrip_corpus():
+    from pathlib import Path
+    from atc.codec_rans import pack as rans_pack, unpack as rans_unpack
+    samples = Path(__file__).resolve().parents[1] / "bench" / "samples"
+    corpus = TEXTS + [p.read_text(encoding="utf-8") for p in sorted(samples.glob("*.txt"))]
+    for t in corpus:
+        for lanes in (1, 5, 32):
+            assert rans_unpack(rans_pack(t, lanes=lanes)) == ac_unpack(ac_pack(t))
+    wide = _wide_text()
+    assert rans_unpack(rans_pack(wide)) == wide
+
+def test_normalize_freqs_wide_alphabet():
+    import numpy as np, pytest
+    from atc.rans import normalize_freqs, _scale_bits
+    counts = np.ones(70000, dtype=np.int64); counts[0] = 10**6
+    freq = normalize_freqs(counts, _scale_bits(counts.size))
+    assert freq.sum() == 1 << _scale_bits(counts.size) and freq.min() >= 1
+    with pytest.raises(ValueError):
+        normalize_freqs(counts, 16)
+
+def test_packer_v2_and_legacy_v1():
+    from atc.packer import pack as rc_pack, unpack as rc_unpack
+    for t in TEXTS:
+        v2 = rc_pack(t)
+        v1 = rc_pack(t, fmt="ATC-AC-v1")
+        assert v2["format"] == "ATC-AC-v2"
+        assert rc_unpack(v2) == t
+        assert rc_unpack(v1) == t
+        assert len(v2["data_b64"]) <= len(v1["data_b64"])
+
+def test_block_container_roundtrip():
+    from atc import blocks
+    text = "Block one, here.  Block TWO?! and   more words...\n" * 40
+    offsets = blocks.split_blocks(text, 300)
+    assert len(offsets) > 1
+    for a in offsets[1:]:
+        assert text[a-1] not in " .,!?;:" and text[a] not in " .,!?;:"
+    ref = ac_unpack(ac_pack(text))
+    obj = blocks.pack(text, block_chars=300, workers=2)
+    assert obj["offsets"] == offsets
+    assert blocks.unpack(obj, workers=2) == ref
+    assert blocks.unpack(blocks.pack(text, codec="simple", block_chars=500, workers=1), workers=1) == ref
+
+def test_seekable_decode_range():
+    from atc import seek
+    text = "Seek here, please.  Then THERE?! ok...\n" * 30 + "文字 tail"
+    ref = ac_unpack(ac_pack(text))
+    obj = seek.pack(text, spacing=16)
+    assert seek.unpack(obj) == ref
+    for a, b in [(0, 5), (17, 90), (400, 401), (len(ref) - 7, len(ref) + 3), (50, 50)]:
+        assert seek.decode_range(obj, a, b) == ref[a:b]
+
+def test_binary_frame_roundtrip(tmp_path):
+    from atc import binfmt
+    from atc.cli import PACKERS, unpack_any
+    from atc.encoder import encode
+    text = TEXTS[-1] * 5
+    ref = ac_unpack(ac_pack(text))
+    for name, fn in PACKERS.items():
+        obj = encode(text) if fn is None else fn(text)
+        blob = binfmt.dumps(obj)
+        assert binfmt.is_binary(blob)
+        assert unpack_any(binfmt.loads(blob)) == ref
+        path = tmp_path / f"{name}.atc"
+        binfmt.dump(obj, str(path))
+        assert unpack_any(binfmt.load(str(path))) == ref
+
+def test_codec_ac_with_trained_prior(tmp_path):
+    import pytest
+    from atc.prior import train, save_prior, load_prior
+    path = tmp_path / "chat.prior.json"
+    save_prior(train(["hello there, how are you?", "Fine thanks!  And you?"] * 20), str(path))
+    prior = load_prior(str(path))
+    for t in TEXTS:
+        for fmt in ("ATC-AC2-v2", "ATC-AC3-v1"):
+            obj = ac_pack(t, fmt=fmt, prior=prior)
+            assert obj["prior"] == prior["id"]
+            assert ac_unpack(obj, prior=prior) == t
+    short = "hello, how are you?"
+    assert len(ac_pack(short, prior=prior)["data_b64"]) < len(ac_pack(short)["data_b64"])
+    with pytest.raises(ValueError):
+        ac_unpack(ac_pack(short, prior=prior))
+
+def test_pack_many_batches():
+    from atc import codec_simple
+    import atc.codec_ac as codec_ac
+    msgs = ["ok.", "Login FAILED for user 42!", "retry in 5s?", "", "naïve café, 文字"]
+    for mod in (codec_ac, codec_simple):
+        expected = [mod.unpack(mod.pack(m)) for m in msgs]
+        objs = mod.pack_many(msgs)
+        assert objs == [mod.pack(m) for m in msgs]
+        assert mod.unpack_many(objs) == expected
+        assert mod.unpack_many(mod.pack_many(msgs, b64=False)) == expected
+        batch = mod.pack_many(msgs, shared_ext=True)
+        assert batch["ext"]
+        assert mod.unpack_many(batch) == expected
+    # batches reuse one encoder and copies of the initial models across items
+    fmt = "ATC-AC3-v1"
+    assert codec_ac.pack_many(msgs * 2, fmt=fmt) == [codec_ac.pack(m, fmt=fmt) for m in msgs * 2]
+
+def test_bitpack_np_matches_py():
+    import numpy as np
+    from atc.bitpack import pack_bits, unpack_bits, pack_bits_py, unpack_bits_py, unpack_bits_np
+    rng = random.Random(3)
+    for w in range(1, 33):
+        for n in (0, 1, 7, 8, 9, 100):
+            vals = [rng.getrandbits(w) for _ in range(n)]
+            packed = pack_bits_py(vals, w)
+            assert pack_bits(vals, w) == pack_bits(np.array(vals, dtype=np.int64), w) == packed
+            assert unpack_bits(packed, n, w) == unpack_bits_py(packed, n, w) == vals
+            assert unpack_bits_np(packed, n + 2, w).tolist() == unpack_bits_py(packed, n + 2, w)
+
+def test_codec_simple_wide_alphabet_and_v1():
+    from atc import codec_simple
+    from atc.bitpack import pack_bits
+    from atc.encoder import encode_raw
+    import base64, zlib
+    rng = random.Random(4)
+    rare = [chr(0x4E00 + i) for i in range(300)]
+    text = " ".join("".join(rng.choice("etaoin") for _ in range(5)) for _ in range(2000))
+    text += " " + " ".join(rare)
+    obj = codec_simple.pack(text)
+    assert obj["header"]["format"] == codec_simple.FORMAT
+    assert codec_simple.unpack(obj) == text
+    # ATC-BITZ-v1 packages (fixed 6-bit streams) still decode
+    car, sty = encode_raw("Hi, you 2!")
+    car_packed = pack_bits([codec_simple.BASE_ALPHABET[c] for c in car], 6)
+    raw = car_packed + pack_bits(sty, 6)
+    v1 = {"header": {"format": "ATC-BITZ-v1", "n": len(sty), "ext": "", "car_len": len(car_packed),
+                     "sty_len": len(raw) - len(car_packed)},
+          "data_b64": base64.b64encode(zlib.compress(raw)).decode("ascii")}
+    assert codec_simple.unpack(v1) == "Hi, you 2!"
+    # short default-backend messages skip the rank tables and are written as v1
+    for t in TEXTS:
+        obj = codec_simple.pack(t)
+        assert obj["header"]["format"] == "ATC-BITZ-v1" and codec_simple.unpack(obj) == t
+        assert codec_simple.pack(t, backend="lzma")["header"]["format"] == codec_simple.FORMAT
+
+def test_codec_simple_backends(tmp_path):
+    import pytest
+    from atc import codec_simple, backends, binfmt
+    text = TEXTS[1] * 50
+    for name in ["zlib-9", "lzma", "bz2", "fast", "balanced", "max", "auto"]:
+        obj = codec_simple.pack(text, backend=name)
+        assert obj["header"]["backend"] in backends.BACKENDS
+        assert codec_simple.unpack(obj) == text
+        binfmt.dump(obj, str(tmp_path / "x.atc"))
+        assert codec_simple.unpack(binfmt.load(str(tmp_path / "x.atc"))) == text
+    assert codec_simple.pack(text, backend="max")["header"]["backend"] == "lzma"
+    with pytest.raises(ValueError):
+        codec_simple.pack(text, backend="nope")
+
+def test_whitespace_layout_is_exact():
+    from atc import codec_simple, binfmt
+    from atc.whitespace import encode_ws, decode_ws
+    from atc.encoder import encode_raw
+    samples = TEXTS + ["def f(x):\n\tif x:\n        return x ,  1\n\n", "  lead, trail  \t",
+                       "a,b,,c\n1,2,3\r\n", "İstanbul ǅ Éa \u200b!", ":)  ;)\n\n\n"]
+    for t in samples:
+        car, sty, ws = encode_ws(t)
+        assert decode_ws(car, sty, ws) == t
+        obj = codec_simple.pack(t, layout="ws")
+        assert codec_simple.unpack(binfmt.loads(binfmt.dumps(obj))) == t
+    code = "for i in range(3):\n        print(i,  i * 2)\n" * 50
+    assert len(encode_ws(code)[0]) < len(encode_raw(code)[0])
+
+def test_codec_ac_word_mode():
+    from atc import codec_ac, binfmt
+    from atc.prior import train
+    prose = "The cat sat on the mat. The dog sat on the log! " * 20 + "ÉCOLE, naïve... 😀 x" + " " * 6 + "y"
+    for t in TEXTS + [prose, "a" * 70]:
+        expected = ac_unpack(ac_pack(t))
+        obj = codec_ac.pack(t, fmt=codec_ac.WORD_FORMAT)
+        assert ac_unpack(obj) == expected
+        assert ac_unpack(binfmt.loads(binfmt.dumps(obj))) == expected
+    assert len(codec_ac.pack(prose, fmt=codec_ac.WORD_FORMAT)["data_b64"]) < len(ac_pack(prose)["data_b64"])
+    prior = train([prose, TEXTS[1]], max_words=16)
+    assert "the" in prior["words"]
+    msg = "The cat sat on the log."
+    obj = codec_ac.pack(msg, fmt=codec_ac.WORD_FORMAT, prior=prior)
+    assert ac_unpack(obj, prior=prior) == msg
+    assert len(obj["data_b64"]) < len(codec_ac.pack(msg, fmt=codec_ac.WORD_FORMAT)["data_b64"])
+
+def test_appender_resumes(tmp_path):
+    import pytest
+    from atc.appender import ATCAppender, read_archive
+    from atc.encoder import encode
+    from atc.decoder import decode
+    path = str(tmp_path / "log.atca")
+    parts = ["Boot ok.\n", "user 42 login", " FAILED!  retry", "... ", "naïve 文字 😀,", "  done.\n"]
+    with ATCAppender(path) as app:
+        app.append(parts[0]); app.append(parts[1])
+    head = open(path, "rb").read()[:8]
+    for i in range(2, len(parts)):
+        with ATCAppender(path) as app:
+            app.append(parts[i])
+        assert read_archive(path) == decode(encode("".join(parts[:i+1])))
+    assert open(path, "rb").read()[:8] == head
+    # resuming reads only the footer and trailer, so a cut-off footer is an error
+    blob = open(path, "rb").read()
+    open(path, "wb").write(blob[:-1])
+    with pytest.raises(ValueError):
+        ATCAppender(path)
+
+def test_codec_ac_semi_static():
+    import pytest
+    from atc import codec_ac, binfmt
+    from atc.arith import StaticModel
+    m = StaticModel([3, 0, 5, 8])
+    assert m.total == 16 and m.find(3) == (2, 3, 8) and m.range(3) == (8, 16)
+    big = StaticModel([1 << 16, 3, 1 << 16])          # past STATIC_LUT_MAX: no lookup table
+    assert big.lut is None and big.find((1 << 16) + 2) == (1, 1 << 16, (1 << 16) + 3)
+    wide = _wide_text()
+    assert codec_ac.unpack(codec_ac.pack(wide, fmt=codec_ac.STATIC_FORMAT)) == wide
+    for t in TEXTS + [TEXTS[1] * 30]:
+        obj = codec_ac.pack(t, fmt=codec_ac.STATIC_FORMAT)
+        assert ac_unpack(obj) == ac_unpack(ac_pack(t))
+        assert ac_unpack(binfmt.loads(binfmt.dumps(obj))) == ac_unpack(ac_pack(t))
+    with pytest.raises(ValueError):
+        codec_ac.pack("hi", fmt=codec_ac.STATIC_FORMAT, prior={"id": 1})
+
+def test_codec_ac_split_streams():
+    from atc import codec_ac, binfmt
+    for t in TEXTS + [TEXTS[1] * 30]:
+        want = ac_unpack(ac_pack(t))
+        obj = codec_ac.pack(t, fmt=codec_ac.SPLIT_FORMAT)
+        assert ac_unpack(obj) == want
+        assert codec_ac.unpack(binfmt.loads(binfmt.dumps(obj)), workers=2) == want
+        assert codec_ac.pack(t, fmt=codec_ac.SPLIT_FORMAT, workers=2) == obj